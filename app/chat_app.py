@@ -8,24 +8,47 @@ tools based on user queries and provides comprehensive responses.
 """
 
 import asyncio
+import inspect
+import signal
 import sys
 import os
+import threading
 from pathlib import Path
 import textwrap
 import logging
+from typing import Optional
 
 # Ensure project root is in sys.path
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.logging_colors import setup_logger, APP_COLOR
-from colorama import Fore
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+from utils.logging_colors import setup_logger, use_color, APP_COLOR
+from colorama import Fore, Style
 
-from app.llm_mcp_connector import process_user_query, get_available_tools, get_available_resources, get_available_prompts, get_server_info, cleanup_integration
+from app.llm_mcp_connector import process_user_query, get_available_tools, get_available_resources, get_available_prompts, get_server_info, warm_up_integration, cleanup_integration
 
 # Configure logging
-logger = setup_logger("chat_app", APP_COLOR, fmt="[APP] %(levelname)s: %(message)s")
+logger = setup_logger("chat_app", APP_COLOR, fmt="[APP] %(levelname)s: %(message)s", queued=False)
 
 # Configure response logger
-response_logger = setup_logger("chat_app_response", Fore.LIGHTBLUE_EX, fmt="%(message)s")
+RESPONSE_COLOR = Fore.LIGHTBLUE_EX
+# Streamed text bypasses the response logger, so it follows the same color rules itself
+STREAM_COLOR = f"{Style.BRIGHT}{RESPONSE_COLOR}" if use_color(sys.stdout) else ""
+response_logger = setup_logger("chat_app_response", RESPONSE_COLOR, fmt="%(message)s", queued=False)
+
+QUIT_COMMANDS = {'quit', 'exit', 'q'}
+
+
+def read_stdin_lines(loop: asyncio.AbstractEventLoop, lines: "asyncio.Queue[Optional[str]]"):
+    """Feed stdin lines to the event loop, then None at end of input.
+
+    Runs in a daemon thread, so a pending read never keeps the process from exiting.
+    """
+    while True:
+        line = sys.stdin.readline()
+        loop.call_soon_threadsafe(lines.put_nowait, line or None)
+        if not line:
+            return
 
 class TrailExplorerChat:
     """Interactive chat interface for Trail Explorer."""
@@ -33,6 +56,9 @@ class TrailExplorerChat:
     def __init__(self):
         """Initialize the chat application."""
         self.running = False
+        self.streamed = False
+        self.warmup: Optional[asyncio.Task] = None
+        self.input_lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
         self.commands = {
             'help': self.show_help,
             'tools': self.show_tools,
@@ -50,30 +76,70 @@ class TrailExplorerChat:
         logger.info("Type 'help' for available commands, 'quit' to exit.")
         print()
         
+        # Connect to the MCP server while the user reads the banner and types
+        self.warmup = asyncio.create_task(warm_up_integration())
+        
+        # Read input without blocking the event loop
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=read_stdin_lines, args=(loop, self.input_lines), daemon=True).start()
+        
+        # Ctrl+C interrupts whatever the session is awaiting, like it interrupted input()
+        try:
+            loop.add_signal_handler(signal.SIGINT, asyncio.current_task().cancel)  # type: ignore
+        except NotImplementedError:
+            pass  # Windows: SIGINT still raises KeyboardInterrupt
+        
         self.running = True
         
+        try:
+            await self.run_session()
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except NotImplementedError:
+                pass
+    
+    async def read_input(self, prompt: str) -> str:
+        """Read a line of user input, raising EOFError at end of input."""
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = await self.input_lines.get()
+        if line is None:
+            raise EOFError
+        return line
+    
+    async def run_session(self):
+        """Answer user input until the user quits."""
         while self.running:
             try:
-                # Get user input
-                user_input = input("You: ").strip()
+                user_input = (await self.read_input("You: ")).strip()
                 if not user_input:
                     continue
-                if user_input.lower() in ['quit', 'exit', 'q']:
+                command = user_input.lower()
+                if command in QUIT_COMMANDS:
                     await self.quit()
                     break
-                if user_input in self.commands:
-                    await self.commands[user_input]()
+                handler = self.commands.get(command)
+                if handler is not None:
+                    result = handler()
+                    if inspect.isawaitable(result):
+                        await result
                     continue
                 
-                # Process the query
+                # Process the query, streaming the response as it arrives
                 logger.info("Assistant: Thinking...")
-                response = await process_user_query(user_input)
+                self.streamed = False
+                response = await process_user_query(user_input, on_text=self.write_stream)
                 
-                # Display the response
-                response_logger.info(f"Assistant: {response}")
+                # Display the response if nothing was streamed (e.g. on an early error);
+                # an error after partial output is streamed along with it
+                if self.streamed:
+                    print()
+                else:
+                    response_logger.info(f"Assistant: {response}")
                 print()
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
                 logger.info("Interrupted by user.")
                 await self.quit()
                 break
@@ -81,6 +147,14 @@ class TrailExplorerChat:
                 logger.error(f"Error: {e}")
                 print("Please try again or type 'quit' to exit.")
     
+    def write_stream(self, text: str):
+        """Write a chunk of streamed response text to the terminal."""
+        if not self.streamed:
+            self.streamed = True
+            text = "Assistant: " + text
+        sys.stdout.write(f"{STREAM_COLOR}{text}")
+        sys.stdout.flush()
+
     async def show_help(self):
         """Show help information."""
         help_text = textwrap.dedent("""
@@ -144,7 +218,11 @@ async def main():
         print(f"Fatal error: {e}")
         return 1
     finally:
-        # Clean up resources
+        # Clean up resources; an unfinished warm-up is abandoned, and the
+        # connection it started is closed by its owner task
+        if chat.warmup is not None:
+            chat.warmup.cancel()
+            await asyncio.gather(chat.warmup, return_exceptions=True)
         await cleanup_integration()
     
     return 0
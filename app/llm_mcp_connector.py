@@ -7,19 +7,23 @@ The LLM uses the available tools, resources and prompts to search
 for trails and provide comprehensive responses.
 """
 
+import asyncio
 import json
 import os
 import sys
-from typing import Dict, List, Optional, Any, Union
+import httpx
+from typing import Callable, Dict, List, Optional, Any, Set, Union
 from pathlib import Path
 from client.trail_mcp_client import TrailMcpClient
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 import textwrap
 from utils.logging_colors import APP_COLOR, setup_logger
 
 # Add the project root to sys.path
-sys.path.append(str(Path(__file__).parent.parent))
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Load environment variables
 load_dotenv()
@@ -27,34 +31,83 @@ load_dotenv()
 # Configure logging
 logger = setup_logger("llm_mcp_connector", APP_COLOR, fmt="[APP] %(levelname)s: %(message)s")
 
+# Schemas in the system prompt are sent compact; the LLM doesn't need them pretty-printed
+PROMPT_JSON_SEPARATORS = (",", ":")
+
+# Rough size budget (in characters) for the conversation resent on each tool round
+MAX_HISTORY_CHARS = 60000
+
+# Keep LLM connections open across the rounds of a multi-tool query
+LLM_HTTP_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=8, keepalive_expiry=300.0)
+LLM_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Tools whose formatted output already answers the query on its own
+TERMINAL_TOOLS = frozenset({"get_trail_statistics"})
+
 
 class LlmMcpConnector:
     """Bridge between LLM and MCP client for automatic tool calling."""
     
-    _instance: Optional["LlmMcpConnector"] = None
+    # The MCP session must be entered and exited by the same task, so the global
+    # connector lives in one owner task from connect until cleanup signals shutdown
+    _owner: Optional["asyncio.Task[None]"] = None
+    _ready: Optional["asyncio.Future[LlmMcpConnector]"] = None
+    _shutdown: Optional[asyncio.Event] = None
 
     @classmethod
     async def get_connector(cls) -> "LlmMcpConnector":
-        if cls._instance is None:
-            cls._instance = cls()
-            await cls._instance.connect()
-        return cls._instance
+        # A startup warm-up and the first query share the owner task's connect
+        if cls._owner is None or cls._owner.done():
+            cls._ready = asyncio.get_running_loop().create_future()
+            cls._shutdown = asyncio.Event()
+            cls._owner = asyncio.create_task(cls._own_connection(cls._ready, cls._shutdown))
+        # Shielded so a cancelled caller doesn't cancel the shared connect
+        return await asyncio.shield(cls._ready)  # type: ignore
+
+    @classmethod
+    async def _own_connection(cls, ready: "asyncio.Future[LlmMcpConnector]", shutdown: asyncio.Event):
+        """Connect, hold the connection until shutdown is signalled, then disconnect."""
+        instance: Optional[LlmMcpConnector] = None
+        try:
+            instance = cls()
+            if not await instance.connect():
+                raise RuntimeError("Failed to connect to MCP server")
+            ready.set_result(instance)
+            await shutdown.wait()
+        except Exception as e:
+            # Hand the failure to waiting callers; the next get_connector() starts over
+            if not ready.done():
+                ready.set_exception(e)
+            if cls._owner is asyncio.current_task():
+                cls._owner = None
+        finally:
+            if not ready.done():
+                ready.cancel()
+            if instance is not None:
+                await instance.disconnect()
 
     @classmethod
     async def cleanup(cls):
-        if cls._instance:
-            await cls._instance.disconnect()
-            cls._instance = None
+        owner, cls._owner = cls._owner, None
+        if owner is not None:
+            cls._shutdown.set()  # type: ignore
+            await owner
 
-    def __init__(self, server_path: str = "server/trail_mcp_server.py"):
+    def __init__(self, server_path: str = "server/trail_mcp_server.py", terminal_tools: Set[str] = TERMINAL_TOOLS):
         """Initialize the LLM-MCP integration."""
         self.server_path = server_path
+        self.terminal_tools = frozenset(terminal_tools)
         self.mcp_client = TrailMcpClient(server_path)
-        self.anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.anthropic = AsyncAnthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            http_client=httpx.AsyncClient(limits=LLM_HTTP_LIMITS, timeout=LLM_HTTP_TIMEOUT)
+        )
         self.available_tools: List[Dict[str, Any]] = []
         self.available_resources: List[Dict[str, Any]] = []
         self.available_prompts: List[Dict[str, Any]] = []
         self.is_connected = False
+        self._terminal_tools: Set[str] = set()
+        self._clear_caches()
         
     async def connect(self) -> bool:
         """Connect to the MCP server and prepare tools, resources, and prompts for LLM."""
@@ -63,8 +116,14 @@ class LlmMcpConnector:
             await self.mcp_client.connect()
             self.is_connected = True
             
-            # Get available tools and convert to LLM format
-            tools = await self.mcp_client.list_tools()
+            # Fetch tools, resources and prompts concurrently
+            tools, resources, prompts = await asyncio.gather(
+                self.mcp_client.list_tools(),
+                self.mcp_client.list_resources(),
+                self.mcp_client.list_prompts()
+            )
+
+            # Convert tools to LLM format
             self.available_tools = []
             
             for tool in tools:
@@ -75,8 +134,7 @@ class LlmMcpConnector:
                 }
                 self.available_tools.append(tool_dict)
             
-            # Get available resources
-            resources = await self.mcp_client.list_resources()
+            # Convert resources
             self.available_resources = []
             
             for resource in resources:
@@ -88,8 +146,7 @@ class LlmMcpConnector:
                 }
                 self.available_resources.append(resource_dict)
             
-            # Get available prompts
-            prompts = await self.mcp_client.list_prompts()
+            # Convert prompts
             self.available_prompts = []
             
             for prompt in prompts:
@@ -111,6 +168,11 @@ class LlmMcpConnector:
                 }
                 self.available_prompts.append(prompt_dict)
             
+            # Only short-circuit tools this server actually exposes
+            self._terminal_tools = self.terminal_tools & {tool["name"] for tool in self.available_tools}
+            
+            self._build_caches()
+            
             logger.info(f"Connected to MCP server with {len(self.available_tools)} tools, {len(self.available_resources)} resources, and {len(self.available_prompts)} prompts")
             return True
             
@@ -119,21 +181,41 @@ class LlmMcpConnector:
             return False
     
     async def disconnect(self):
-        """Disconnect from the MCP server."""
+        """Disconnect from the MCP server and release the LLM client."""
+        await self.anthropic.close()
         if self.is_connected:
             await self.mcp_client.disconnect()
             self.is_connected = False
+            self._clear_caches()
             logger.info("Disconnected from MCP server")
     
-    async def process_query(self, query: str) -> str:
-        """Process a user query using the LLM with automatic tool calling (multi-step)."""
+    async def process_query(self, query: str, on_text: Optional[Callable[[str], None]] = None) -> str:
+        """Process a user query using the LLM with automatic tool calling (multi-step).
+
+        If on_text is given, response text is passed to it as it streams in.
+        """
         if not self.is_connected:
             raise RuntimeError("Not connected to MCP server")
         
+        if self._system_prompt is None:
+            self._system_prompt = self._create_system_prompt()
+        
+        # The static prompt block is marked cacheable so follow-up rounds reuse
+        # the cached prefix (tools + instructions) instead of reprocessing it
         messages = [
             {
                 "role": "user",
-                "content": self._create_system_prompt() + f"\n\nUser Query: {query}"
+                "content": [
+                    {
+                        "type": "text",
+                        "text": self._system_prompt,
+                        "cache_control": {"type": "ephemeral"}
+                    },
+                    {
+                        "type": "text",
+                        "text": f"User Query: {query}"
+                    }
+                ]
             }
         ]
         
@@ -141,14 +223,23 @@ class LlmMcpConnector:
         final_response: List[str] = []
         
         while True:
-            # LLM call with tools
-            response = self.anthropic.messages.create(
+            # Streamed LLM call with tools
+            async with self.anthropic.messages.stream(
                 model="claude-sonnet-4-20250514",
                 max_tokens=2000,
                 messages=conversation_history,  # type: ignore
                 tools=self.available_tools  # type: ignore
+            ) as stream:
+                if on_text is not None:
+                    async for text in stream.text_stream:
+                        on_text(text)
+                response = await stream.get_final_message()
+            logger.debug(
+                "Prompt cache: %s tokens read, %s tokens written",
+                response.usage.cache_read_input_tokens,
+                response.usage.cache_creation_input_tokens
             )
-            
+
             # Add assistant response to history
             conversation_history.append({
                 "role": "assistant",
@@ -164,31 +255,26 @@ class LlmMcpConnector:
                 elif content.type == 'tool_use':
                     tool_calls.append(content)
             
-            # If there are tool calls, execute them and add results to history
+            # If there are tool calls, execute them concurrently and add results to history
             if tool_calls:
-                for tool_call in tool_calls:
-                    tool_name = tool_call.name
-                    tool_args = tool_call.input
-                    try:
-                        logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
-                        tool_result = await self.mcp_client.call_tool(tool_name, tool_args)  # type: ignore
-                        logger.info(f"Tool result: {tool_result[:100]}...")
-                        # Add tool result to conversation
-                        tool_result_message: Dict[str, Any] = {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "tool_result",
-                                    "tool_use_id": tool_call.id,
-                                    "content": tool_result
-                                }
-                            ]
-                        }
-                        conversation_history.append(tool_result_message)
-                    except Exception as e:
-                        error_msg = f"Error calling tool {tool_name}: {str(e)}"
-                        logger.error(error_msg)
-                        text_chunks.append(f"\n{error_msg}")
+                if on_text is not None and text_chunks:
+                    on_text("\n")
+                tool_results = await asyncio.gather(*[self._invoke_tool(tool_call) for tool_call in tool_calls])
+                
+                # A lone terminal tool answering the query directly needs no second LLM round
+                if self._is_terminal_answer(conversation_history, tool_calls, text_chunks, tool_results):
+                    answer = tool_results[0]["content"]
+                    if on_text is not None:
+                        on_text(answer)
+                    final_response.append(answer)
+                    break
+                
+                # All tool_result blocks for one assistant turn go in a single user message
+                conversation_history.append({
+                    "role": "user",
+                    "content": list(tool_results)
+                })
+                self._trim_history(conversation_history)
                 # Continue the loop for another LLM round
                 continue
             else:
@@ -196,7 +282,62 @@ class LlmMcpConnector:
                 final_response.extend(text_chunks)
                 break
         return "\n".join(final_response)
-    
+
+    def _is_terminal_answer(
+        self,
+        conversation_history: List[Dict[str, Any]],
+        tool_calls: List[Any],
+        text_chunks: List[str],
+        tool_results: List[Dict[str, Any]]
+    ) -> bool:
+        """Check whether the first LLM round was a single, successful, text-free terminal tool call."""
+        return (
+            len(conversation_history) == 2
+            and len(tool_calls) == 1
+            and not text_chunks
+            and tool_calls[0].name in self._terminal_tools
+            and not tool_results[0].get("is_error")
+        )
+
+    def _trim_history(self, conversation_history: List[Dict[str, Any]]):
+        """Drop the oldest tool rounds once the history exceeds MAX_HISTORY_CHARS.
+
+        The initial query message and the latest tool_use/tool_result pair are always kept,
+        so the remaining messages still alternate user/assistant with matched tool ids.
+        """
+        sizes = [len(str(message["content"])) for message in conversation_history]
+        total = sum(sizes)
+        dropped = 0
+        while total > MAX_HISTORY_CHARS and len(conversation_history) - dropped > 3:
+            total -= sizes[1 + dropped] + sizes[2 + dropped]
+            dropped += 2
+        if dropped:
+            del conversation_history[1:1 + dropped]
+            logger.info(f"Trimmed {dropped // 2} earlier tool round(s) from the conversation")
+
+    async def _invoke_tool(self, tool_call: Any) -> Dict[str, Any]:
+        """Call a single tool and wrap its output (or error) as a tool_result block."""
+        tool_name = tool_call.name
+        tool_args = tool_call.input
+        try:
+            logger.info("Calling tool: %s with args: %s", tool_name, tool_args)
+            tool_result = await self.mcp_client.call_tool(tool_name, tool_args)  # type: ignore
+            logger.debug("Tool result: %.100s...", tool_result)
+            return {
+                "type": "tool_result",
+                "tool_use_id": tool_call.id,
+                "content": tool_result
+            }
+        except Exception as e:
+            error_msg = f"Error calling tool {tool_name}: {str(e)}"
+            logger.error(error_msg)
+            return {
+                "type": "tool_result",
+                "tool_use_id": tool_call.id,
+                "content": error_msg,
+                "is_error": True
+            }
+
     async def get_resource_data(self, uri: str) -> str:
         """Get data from a specific resource."""
         if not self.is_connected:
@@ -266,7 +407,7 @@ class LlmMcpConnector:
         for tool in self.available_tools:
             desc = f"• {tool['name']}: {tool['description']}"
             if tool.get('input_schema'):
-                desc += f"\n  Input: {json.dumps(tool['input_schema'], indent=2)}"
+                desc += f"\n  Input: {json.dumps(tool['input_schema'], separators=PROMPT_JSON_SEPARATORS)}"
             tool_descriptions.append(desc)
         
         return "\n".join(tool_descriptions)
@@ -292,13 +433,56 @@ class LlmMcpConnector:
         for prompt in self.available_prompts:
             desc = f"• {prompt['name']}: {prompt['description']}"
             if prompt.get('arguments'):
-                desc += f"\n  Arguments: {json.dumps(prompt['arguments'], indent=2)}"
+                desc += f"\n  Arguments: {json.dumps(prompt['arguments'], separators=PROMPT_JSON_SEPARATORS)}"
             prompt_descriptions.append(desc)
         
         return "\n".join(prompt_descriptions)
     
     async def get_tool_descriptions(self) -> str:
         """Get descriptions of available tools for display."""
+        if self._tool_descriptions is None:
+            self._tool_descriptions = self._build_tool_descriptions()
+        return self._tool_descriptions
+    
+    async def get_resource_descriptions(self) -> str:
+        """Get descriptions of available resources for display."""
+        if self._resource_descriptions is None:
+            self._resource_descriptions = self._build_resource_descriptions()
+        return self._resource_descriptions
+    
+    async def get_prompt_descriptions(self) -> str:
+        """Get descriptions of available prompts for display."""
+        if self._prompt_descriptions is None:
+            self._prompt_descriptions = self._build_prompt_descriptions()
+        return self._prompt_descriptions
+    
+    async def get_server_info(self) -> str:
+        """Get server information for display."""
+        if not self.is_connected:
+            return "Not connected to server"
+        
+        if self._server_info is None:
+            self._server_info = self._build_server_info()
+        return self._server_info
+
+    def _build_caches(self):
+        """Render the prompt and display strings once; capabilities don't change while connected."""
+        self._system_prompt = self._create_system_prompt()
+        self._tool_descriptions = self._build_tool_descriptions()
+        self._resource_descriptions = self._build_resource_descriptions()
+        self._prompt_descriptions = self._build_prompt_descriptions()
+        self._server_info = self._build_server_info()
+
+    def _clear_caches(self):
+        """Drop the rendered prompt and display strings."""
+        self._system_prompt: Optional[str] = None
+        self._tool_descriptions: Optional[str] = None
+        self._resource_descriptions: Optional[str] = None
+        self._prompt_descriptions: Optional[str] = None
+        self._server_info: Optional[str] = None
+
+    def _build_tool_descriptions(self) -> str:
+        """Format the available tools for display."""
         if not self.available_tools:
             return "No tools available"
         
@@ -311,8 +495,8 @@ class LlmMcpConnector:
         
         return "\n\n".join(descriptions)
     
-    async def get_resource_descriptions(self) -> str:
-        """Get descriptions of available resources for display."""
+    def _build_resource_descriptions(self) -> str:
+        """Format the available resources for display."""
         if not self.available_resources:
             return "No resources available"
         
@@ -323,8 +507,8 @@ class LlmMcpConnector:
         
         return "\n\n".join(descriptions)
     
-    async def get_prompt_descriptions(self) -> str:
-        """Get descriptions of available prompts for display."""
+    def _build_prompt_descriptions(self) -> str:
+        """Format the available prompts for display."""
         if not self.available_prompts:
             return "No prompts available"
         
@@ -336,53 +520,56 @@ class LlmMcpConnector:
             descriptions.append(desc)
         
         return "\n\n".join(descriptions)
-    
-    async def get_server_info(self) -> str:
-        """Get server information for display."""
-        if not self.is_connected:
-            return "Not connected to server"
+
+    def _build_server_info(self) -> str:
+        """Format the server information for display."""
+        result = []
+        result.append(f"Server Information:")
+        result.append(f"Tools: {len(self.available_tools)}")
+        result.append(f"Resources: {len(self.available_resources)}")
+        result.append(f"Prompts: {len(self.available_prompts)}")
         
-        try:
-            info = await self.mcp_client.get_server_info()
-            
-            # Format the info as a readable string
-            result = []
-            result.append(f"Server Information:")
-            result.append(f"Tools: {len(self.available_tools)}")
-            result.append(f"Resources: {len(self.available_resources)}")
-            result.append(f"Prompts: {len(self.available_prompts)}")
-            
-            if self.available_tools:
-                result.append("\nTools:")
-                for tool in self.available_tools:
-                    result.append(f"  - {tool['name']}: {tool['description']}")
-            
-            if self.available_resources:
-                result.append("\nResources:")
-                for resource in self.available_resources:
-                    result.append(f"  - {resource['uri']}: {resource['description']}")
-            
-            if self.available_prompts:
-                result.append("\nPrompts:")
-                for prompt in self.available_prompts:
-                    result.append(f"  - {prompt['name']}: {prompt['description']}")
-            
-            return "\n".join(result)
-            
-        except Exception as e:
-            logger.error(f"Error getting server info: {e}")
-            return f"Error getting server info: {str(e)}"
+        if self.available_tools:
+            result.append("\nTools:")
+            for tool in self.available_tools:
+                result.append(f"  - {tool['name']}: {tool['description']}")
+        
+        if self.available_resources:
+            result.append("\nResources:")
+            for resource in self.available_resources:
+                result.append(f"  - {resource['uri']}: {resource['description']}")
+        
+        if self.available_prompts:
+            result.append("\nPrompts:")
+            for prompt in self.available_prompts:
+                result.append(f"  - {prompt['name']}: {prompt['description']}")
+        
+        return "\n".join(result)
+
+
+async def process_user_query(query: str, on_text: Optional[Callable[[str], None]] = None) -> str:
+    """Process a user query using the LLM-MCP integration.
+
+    If streaming fails after some text was passed to on_text, the error message is
+    streamed too, so the cut-off answer doesn't end without explanation.
+    """
+    streamed = False
 
+    def forward(text: str):
+        nonlocal streamed
+        streamed = True
+        on_text(text)  # type: ignore
 
-async def process_user_query(query: str) -> str:
-    """Process a user query using the LLM-MCP integration."""
     try:
         connector = await LlmMcpConnector.get_connector()
-        result = await connector.process_query(query)
+        result = await connector.process_query(query, on_text=forward if on_text is not None else None)
         return result
     except Exception as e:
         logger.error(f"Error processing query: {e}")
-        return f"Sorry, I encountered an error while processing your query: {str(e)}"
+        error_msg = f"Sorry, I encountered an error while processing your query: {str(e)}"
+        if streamed:
+            on_text("\n" + error_msg)  # type: ignore
+        return error_msg
 
 
 async def get_available_tools() -> str:
@@ -425,6 +612,14 @@ async def get_server_info() -> str:
         return f"Error getting server info: {str(e)}"
 
 
+async def warm_up_integration():
+    """Connect the global connector ahead of the first query."""
+    try:
+        await LlmMcpConnector.get_connector()
+    except Exception as e:
+        logger.error(f"Error warming up connector: {e}")
+
+
 async def cleanup_integration():
     """Clean up the global connector instance."""
     await LlmMcpConnector.cleanup() 
\ No newline at end of file
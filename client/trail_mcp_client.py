@@ -9,16 +9,19 @@ Trail Explorer MCP server, including fetching tools, resources, and prompts.
 import asyncio
 import json
 import logging
+import re
 import sys
-from typing import Dict, List, Optional, Any, Union
+import time
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
 from contextlib import AsyncExitStack
 from dataclasses import dataclass
 from pathlib import Path
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
 from mcp.types import (
-    TextContent,
+    TextContent, TextResourceContents,
     Tool, Resource, Prompt
 )
 from pydantic import AnyUrl
@@ -29,10 +32,12 @@ from utils.logging_colors import setup_logger, CLIENT_COLOR
 logger = setup_logger("trail_mcp_client", CLIENT_COLOR, fmt="[CLIENT] %(levelname)s: %(message)s")
 
 # Add project root to sys.path
-sys.path.append(str(Path(__file__).parent.parent))
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 
-@dataclass
+@dataclass(slots=True)
 class TrailSearchResult:
     """Container for trail search results."""
     location: str
@@ -40,9 +45,10 @@ class TrailSearchResult:
     trail_types: Dict[str, int]
     trails: List[Dict[str, Any]]
     raw_data: str
+    error: Optional[str] = None  # Set to raw_data when the server answered with an error instead of trails
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServerCapabilities:
     """Container for server capabilities."""
     tools: List[Tool]
@@ -50,8 +56,101 @@ class ServerCapabilities:
     prompts: List[Prompt]
 
 
+@dataclass(frozen=True)
+class ResultRef:
+    """Placeholder in batched tool arguments for the result of an earlier call."""
+    index: int
+
+
+# Trail types searched when the caller doesn't narrow them
+_DEFAULT_TRAIL_TYPES = ("hiking", "biking", "walking")
+
+# Building a TypeAdapter compiles a validator, so do it once
+_ANYURL_ADAPTER = TypeAdapter(AnyUrl)
+
+
+def _canonical_json(value: Any) -> str:
+    """Serialize arguments deterministically for use in cache keys."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+# Patterns for the server's formatted trail summary (see format_trail_data)
+_TYPE_COUNT_RE = re.compile(r"^- (\w+): (\d+)$", re.MULTILINE)
+_TRAIL_LINE_RE = re.compile(r"^(?P<name>.*) \((?P<type>\w+)(?P<details>(?: \| .*)?)\)$")
+# The server emits these fields in this order; values (descriptions especially) may contain " | "
+_TRAIL_DETAILS_RE = re.compile(
+    r"(?: \| Distance: (?P<distance>.*?))?"
+    r"(?: \| Surface: (?P<surface>.*?))?"
+    r"(?: \| Difficulty: (?P<difficulty>.*?))?"
+    r"(?: \| Description: (?P<description>.*))?"
+)
+_SUMMARY_HEADER_RE = re.compile(r"^Found \d+ trail elements:")
+_NO_TRAILS_PREFIX = "No trails found"
+_DETAILS_HEADER = "Trail Details:\n"
+
+
+def _parse_trail_summary(text: str) -> Optional[Tuple[int, Dict[str, int], List[Dict[str, Any]]]]:
+    """Parse a formatted trail summary into (trail count, counts by type, trail details).
+    
+    Returns None if the text is not a trail summary (e.g. a server error message).
+    """
+    if text.startswith(_NO_TRAILS_PREFIX):
+        return 0, {}, []
+    if not _SUMMARY_HEADER_RE.match(text):
+        return None
+    
+    summary, _, details = text.partition(_DETAILS_HEADER)
+    
+    trail_types = {trail_type.lower(): int(count) for trail_type, count in _TYPE_COUNT_RE.findall(summary)}
+    
+    trails: List[Dict[str, Any]] = []
+    for line in details.splitlines():
+        match = _TRAIL_LINE_RE.match(line)
+        if not match:
+            continue
+        trail: Dict[str, Any] = {"name": match["name"], "type": match["type"].lower()}
+        fields = _TRAIL_DETAILS_RE.fullmatch(match["details"])
+        if fields:
+            trail.update((key, value) for key, value in fields.groupdict().items() if value is not None)
+        trails.append(trail)
+    
+    return sum(trail_types.values()), trail_types, trails
+
+
+def _search_result(location: str, text: str) -> TrailSearchResult:
+    """Build a search result from a search tool's output, flagging output that isn't a summary."""
+    parsed = _parse_trail_summary(text)
+    if parsed is None:
+        return TrailSearchResult(location=location, trail_count=0, trail_types={}, trails=[], raw_data=text, error=text)
+    trail_count, trail_types, trails = parsed
+    return TrailSearchResult(
+        location=location,
+        trail_count=trail_count,
+        trail_types=trail_types,
+        trails=trails,
+        raw_data=text
+    )
+
+
+def _join_text(items: List[Any], text_type: type) -> str:
+    """Join the text of content items of text_type (or plain dicts with a 'text' key)."""
+    return "\n".join([
+        item.text if isinstance(item, text_type) else str(item['text'])
+        for item in items
+        if isinstance(item, text_type) or (isinstance(item, dict) and 'text' in item)
+    ])
+
+
 class TrailMcpClient:
-    """MCP client for Trail Explorer server with comprehensive capabilities."""
+    """MCP client for Trail Explorer server with comprehensive capabilities.
+    
+    Use it as an async context manager so a session always exists while it is in use:
+    
+        async with TrailMcpClient() as client:
+            await client.search_trails_by_area_name("Central Park")
+    
+    Request methods raise RuntimeError when there is no connected session.
+    """
     
     def __init__(self, server_path: str = "server/trail_mcp_server.py"):
         """Initialize the MCP client."""
@@ -59,15 +158,30 @@ class TrailMcpClient:
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
         self.capabilities: Optional[ServerCapabilities] = None
+        self._tool_index: Dict[str, Tool] = {}
+        self._resource_index: Dict[str, Resource] = {}
+        self._prompt_index: Dict[str, Prompt] = {}
+        self._capabilities_lock = asyncio.Lock()
+        self._server_info_cache: Dict[Tuple[Tuple[str, ...], bool], Dict[str, Any]] = {}
+        self._response_cache: Dict[Tuple[str, ...], Tuple[float, str]] = {}
+        self._trail_types_cache: Optional[str] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
         
+    async def __aenter__(self) -> "TrailMcpClient":
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.disconnect()
+    
     async def connect(self) -> bool:
         """Connect to the Trail Explorer MCP server."""
         try:
-            logger.info(f"Connecting to server at {self.server_path}")
+            logger.info("Connecting to server at %s", self.server_path)
             
-            # Create server parameters
+            # Create server parameters (reuse this interpreter rather than resolving "python" on PATH)
             server_params = StdioServerParameters(
-                command="python",
+                command=sys.executable,
                 args=[self.server_path],
                 env=None
             )
@@ -75,35 +189,56 @@ class TrailMcpClient:
             # Connect to the server
             stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
             self.stdio, self.write = stdio_transport
-            self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+            await self._start_session()
+            
+            logger.info("Connected to Trail Explorer MCP server")
+            return True
             
-            # Initialize the session
-            await self.session.initialize()
+        except Exception as e:
+            logger.error("Failed to connect to server: %s", e)
+            raise
+    
+    async def connect_http(self, url: str = "http://127.0.0.1:8000/mcp") -> bool:
+        """Connect to an already-running Trail Explorer server over streamable HTTP.
+        
+        Unlike connect(), no server process is spawned; start one with
+        `python server/trail_mcp_server.py --transport streamable-http`.
+        """
+        try:
+            logger.info("Connecting to server at %s", url)
             
-            # Fetch server capabilities
-            await self._fetch_capabilities()
+            http_transport = await self.exit_stack.enter_async_context(streamablehttp_client(url))
+            self.stdio, self.write, _ = http_transport
+            await self._start_session()
             
             logger.info("Connected to Trail Explorer MCP server")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to connect to server: {e}")
+            logger.error("Failed to connect to server: %s", e)
             raise
     
+    async def _start_session(self):
+        """Open and initialize a session over the connected transport streams."""
+        self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+        
+        # Initialize the session
+        await self.session.initialize()
+        
+        # Fetch server capabilities
+        await self._fetch_capabilities()
+    
     async def _fetch_capabilities(self):
         """Fetch server capabilities (tools, resources, prompts)."""
-        if not self.session:
-            raise RuntimeError("Not connected to server")
+        session = self._require_session()
             
         try:
-            # List tools
-            tools_response = await self.session.list_tools()
-            
-            # List resources
-            resources_response = await self.session.list_resources()
-            
-            # List prompts
-            prompts_response = await self.session.list_prompts()
+            # List tools, resources and prompts concurrently
+            tools_response, resources_response, prompts_response = await asyncio.gather(
+                session.list_tools(),
+                session.list_resources(),
+                session.list_prompts()
+            )
             
             self.capabilities = ServerCapabilities(
                 tools=tools_response.tools,
@@ -111,171 +246,283 @@ class TrailMcpClient:
                 prompts=prompts_response.prompts
             )
             
-            logger.info(f"Server capabilities loaded:")
-            logger.info(f"  - Tools: {len(self.capabilities.tools)}")
-            logger.info(f"  - Resources: {len(self.capabilities.resources)}")
-            logger.info(f"  - Prompts: {len(self.capabilities.prompts)}")
+            # Index capabilities for constant-time lookups by name/URI
+            self._tool_index = {tool.name: tool for tool in self.capabilities.tools}
+            self._resource_index = {str(resource.uri): resource for resource in self.capabilities.resources}
+            self._prompt_index = {prompt.name: prompt for prompt in self.capabilities.prompts}
+            self._server_info_cache = {}
+            
+            logger.info("Server capabilities loaded:")
+            logger.info("  - Tools: %d", len(self.capabilities.tools))
+            logger.info("  - Resources: %d", len(self.capabilities.resources))
+            logger.info("  - Prompts: %d", len(self.capabilities.prompts))
             
         except Exception as e:
-            logger.error(f"Failed to fetch capabilities: {e}")
+            logger.error("Failed to fetch capabilities: %s", e)
             raise
     
+    async def _ensure_capabilities(self) -> ServerCapabilities:
+        """Return the server capabilities, fetching them on first use.
+        
+        Concurrent callers share a single fetch.
+        """
+        if self.capabilities is None:
+            async with self._capabilities_lock:
+                if self.capabilities is None:
+                    await self._fetch_capabilities()
+        assert self.capabilities is not None
+        return self.capabilities
+    
+    def _require_session(self) -> ClientSession:
+        """Return the connected session, raising if there is none."""
+        if self.session is None:
+            raise RuntimeError("Not connected to server")
+        return self.session
+    
     async def disconnect(self):
         """Disconnect from the server."""
-        if self.session:
-            await self.exit_stack.aclose()
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        self._trail_types_cache = None
+        # Also closes a transport left open by a connect that failed before its session started
+        session, self.session = self.session, None
+        await self.exit_stack.aclose()
+        if session:
             logger.info("Disconnected from Trail Explorer MCP server")
     
+    async def keepalive_ping(self, interval: float = 30.0):
+        """Ping the server every interval seconds until cancelled or a ping fails."""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.session:
+                logger.warning("Stopping keepalive: not connected to server")
+                return
+            try:
+                await self.session.send_ping()
+            except Exception as e:
+                logger.warning("Stopping keepalive after failed ping: %s", e)
+                return
+    
+    def start_keepalive(self, interval: float = 30.0):
+        """Schedule keepalive pings in the background so an idle session isn't torn down."""
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.create_task(self.keepalive_ping(interval))
+    
+    # Response cache helpers
+    def _cache_get(self, key: Tuple[str, ...]) -> Optional[str]:
+        """Return a cached response if it has not expired."""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._response_cache[key]
+            return None
+        return value
+    
+    def _cache_put(self, key: Tuple[str, ...], value: str, ttl: float):
+        """Store a response for ttl seconds."""
+        self._response_cache[key] = (time.monotonic() + ttl, value)
+    
+    def clear_cache(self):
+        """Drop all cached tool, resource and prompt responses."""
+        self._response_cache.clear()
+    
     # Tool-related methods
     async def list_tools(self) -> List[Tool]:
         """Get list of available tools."""
-        if not self.session:
-            raise RuntimeError("Not connected to server")
-        
-        if self.capabilities:
-            return self.capabilities.tools
-        else:
-            response = await self.session.list_tools()
-            return response.tools
+        capabilities = await self._ensure_capabilities()
+        return capabilities.tools
     
     async def get_tool_info(self, tool_name: str) -> Optional[Tool]:
         """Get information about a specific tool."""
-        tools = await self.list_tools()
-        for tool in tools:
-            if tool.name == tool_name:
-                return tool
-        return None
+        await self._ensure_capabilities()
+        return self._tool_index.get(tool_name)
     
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
-        """Call a tool on the server."""
-        if not self.session:
-            raise RuntimeError("Not connected to server")
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any], cache_ttl: Optional[float] = None) -> str:
+        """Call a tool on the server.
         
+        If cache_ttl is given, an identical call within that many seconds is served from memory.
+        """
+        cache_key = ("tool", tool_name, _canonical_json(arguments))
+        if cache_ttl is not None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
+        session = self._require_session()
         try:
-            result = await self.session.call_tool(tool_name, arguments)
+            result = await session.call_tool(tool_name, arguments)
             
             # Extract text content from result
             if result.content:
-                text_parts = []
-                for content_item in result.content:
-                    if isinstance(content_item, TextContent):
-                        text_parts.append(content_item.text)
-                    elif isinstance(content_item, dict) and 'text' in content_item:
-                        text_parts.append(str(content_item['text']))
-                
-                return "\n".join(text_parts)
+                text = _join_text(result.content, TextContent)
             else:
-                return "No content returned from tool"
+                text = "No content returned from tool"
+            
+            if cache_ttl is not None:
+                self._cache_put(cache_key, text, cache_ttl)
+            return text
                 
         except Exception as e:
-            logger.error(f"Error calling tool {tool_name}: {e}")
+            logger.error("Error calling tool %s: %s", tool_name, e)
             raise
     
+    async def call_tools_batch(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Union[str, BaseException]]:
+        """Call several tools, running independent calls concurrently.
+        
+        An argument value may be ResultRef(i) to receive the text result of calls[i].
+        Calls are dispatched in dependency layers, each layer with asyncio.gather.
+        A failed call (or one depending on it) yields its exception in place of a result.
+        """
+        # Place each call one layer below its deepest dependency
+        depths: List[int] = []
+        layers: List[List[int]] = []
+        for index, (_, arguments) in enumerate(calls):
+            depth = 0
+            for value in arguments.values():
+                if isinstance(value, ResultRef):
+                    if not 0 <= value.index < index:
+                        raise ValueError(f"Call {index} references call {value.index}; references must point to earlier calls")
+                    depth = max(depth, depths[value.index] + 1)
+            depths.append(depth)
+            if depth == len(layers):
+                layers.append([])
+            layers[depth].append(index)
+        
+        results: List[Union[str, BaseException]] = [""] * len(calls)
+        for layer in layers:
+            outcomes = await asyncio.gather(
+                *(self._call_tool_with_refs(calls[index], results) for index in layer),
+                return_exceptions=True
+            )
+            for index, outcome in zip(layer, outcomes):
+                results[index] = outcome
+        return results
+    
+    async def _call_tool_with_refs(
+        self,
+        call: Tuple[str, Dict[str, Any]],
+        results: List[Union[str, BaseException]]
+    ) -> str:
+        """Substitute earlier results for ResultRef arguments, then call the tool."""
+        tool_name, arguments = call
+        resolved = {}
+        for key, value in arguments.items():
+            if isinstance(value, ResultRef):
+                dependency = results[value.index]
+                if isinstance(dependency, BaseException):
+                    raise RuntimeError(f"Call {value.index} needed by tool {tool_name} failed") from dependency
+                value = dependency
+            resolved[key] = value
+        return await self.call_tool(tool_name, resolved)
+    
     # Resource-related methods
     async def list_resources(self) -> List[Resource]:
         """Get list of available resources."""
-        if not self.session:
-            raise RuntimeError("Not connected to server")
-        
-        if self.capabilities:
-            return self.capabilities.resources
-        else:
-            response = await self.session.list_resources()
-            return response.resources
+        capabilities = await self._ensure_capabilities()
+        return capabilities.resources
     
     async def get_resource_info(self, uri: str) -> Optional[Resource]:
         """Get information about a specific resource."""
-        resources = await self.list_resources()
-        for resource in resources:
-            if resource.uri == uri:
-                return resource
-        return None
+        await self._ensure_capabilities()
+        return self._resource_index.get(str(uri))
     
-    async def read_resource(self, uri: str) -> str:
-        """Read a resource from the server."""
-        if not self.session:
-            raise RuntimeError("Not connected to server")
+    async def read_resource(self, uri: Union[str, AnyUrl], cache_ttl: Optional[float] = None) -> str:
+        """Read a resource from the server.
         
+        Strings are validated as URLs; AnyUrl instances are trusted and passed through as-is.
+        If cache_ttl is given, a repeat read within that many seconds is served from memory.
+        """
+        cache_key = ("resource", str(uri))
+        if cache_ttl is not None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
+        session = self._require_session()
         try:
-            # Validate URI format
-            validated_uri = TypeAdapter(AnyUrl).validate_python(uri)
-            result = await self.session.read_resource(validated_uri)
+            # Validate URI format (skipped for URIs that are already AnyUrl)
+            validated_uri = uri if isinstance(uri, AnyUrl) else _ANYURL_ADAPTER.validate_python(uri)
+            result = await session.read_resource(validated_uri)
             
             # Extract text content from result
             if result.contents:
-                text_parts = []
-                for content_item in result.contents:
-                    if isinstance(content_item, TextContent):
-                        text_parts.append(content_item.text)
-                    elif isinstance(content_item, dict) and 'text' in content_item:
-                        text_parts.append(str(content_item['text']))
-                
-                return "\n".join(text_parts)
+                text = _join_text(result.contents, TextResourceContents)
             else:
-                return "No content returned from resource"
+                text = "No content returned from resource"
+            
+            if cache_ttl is not None:
+                self._cache_put(cache_key, text, cache_ttl)
+            return text
                 
         except Exception as e:
-            logger.error(f"Error reading resource {uri}: {e}")
+            logger.error("Error reading resource %s: %s", uri, e)
             raise
     
     # Prompt-related methods
     async def list_prompts(self) -> List[Prompt]:
         """Get list of available prompts."""
-        if not self.session:
-            raise RuntimeError("Not connected to server")
-        
-        if self.capabilities:
-            return self.capabilities.prompts
-        else:
-            response = await self.session.list_prompts()
-            return response.prompts
+        capabilities = await self._ensure_capabilities()
+        return capabilities.prompts
     
     async def get_prompt_info(self, prompt_name: str) -> Optional[Prompt]:
         """Get information about a specific prompt."""
-        prompts = await self.list_prompts()
-        for prompt in prompts:
-            if prompt.name == prompt_name:
-                return prompt
-        return None
+        await self._ensure_capabilities()
+        return self._prompt_index.get(prompt_name)
     
-    async def get_prompt(self, prompt_name: str, arguments: Optional[Dict[str, Any]] = None) -> str:
-        """Get a prompt from the server."""
-        if not self.session:
-            raise RuntimeError("Not connected to server")
+    async def get_prompt(
+        self,
+        prompt_name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        cache_ttl: Optional[float] = None
+    ) -> str:
+        """Get a prompt from the server.
         
+        If cache_ttl is given, an identical request within that many seconds is served from memory.
+        """
+        cache_key = ("prompt", prompt_name, _canonical_json(arguments))
+        if cache_ttl is not None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
+        session = self._require_session()
         try:
-            result = await self.session.get_prompt(prompt_name, arguments)
+            result = await session.get_prompt(prompt_name, arguments)
             
             if result.description:
-                return result.description
+                text = result.description
             else:
-                return f"Prompt: {prompt_name}"
+                text = f"Prompt: {prompt_name}"
+            
+            if cache_ttl is not None:
+                self._cache_put(cache_key, text, cache_ttl)
+            return text
                 
         except Exception as e:
-            logger.error(f"Error getting prompt {prompt_name}: {e}")
+            logger.error("Error getting prompt %s: %s", prompt_name, e)
             raise
     
     # Convenience methods for trail-specific operations
     async def search_trails_by_area_name(
         self, 
         area_name: str, 
-        trail_types: Optional[List[str]] = None
+        trail_types: Optional[List[str]] = None,
+        cache_ttl: Optional[float] = None
     ) -> TrailSearchResult:
         """Search for trails in a specific area."""
         arguments = {
             "area_name": area_name,
-            "trail_types": trail_types or ["hiking", "biking", "walking"]
+            "trail_types": list(trail_types or _DEFAULT_TRAIL_TYPES)
         }
         
-        result = await self.call_tool("search_trails_by_area_name", arguments)
-        
-        return TrailSearchResult(
-            location=area_name,
-            trail_count=0,  # Will be parsed from response
-            trail_types={},
-            trails=[],
-            raw_data=result
-        )
+        result = await self.call_tool("search_trails_by_area_name", arguments, cache_ttl=cache_ttl)
+        return _search_result(area_name, result)
     
     async def search_trails_by_coordinates(
         self,
@@ -283,7 +530,8 @@ class TrailMcpClient:
         west: float,
         north: float,
         east: float,
-        trail_types: Optional[List[str]] = None
+        trail_types: Optional[Sequence[str]] = None,
+        cache_ttl: Optional[float] = None
     ) -> TrailSearchResult:
         """Search for trails within specific coordinates."""
         arguments = {
@@ -291,18 +539,36 @@ class TrailMcpClient:
             "west": west,
             "north": north,
             "east": east,
-            "trail_types": trail_types or ["hiking", "biking", "walking"]
+            "trail_types": list(trail_types or _DEFAULT_TRAIL_TYPES)
         }
         
-        result = await self.call_tool("search_trails_by_coordinates", arguments)
+        result = await self.call_tool("search_trails_by_coordinates", arguments, cache_ttl=cache_ttl)
+        return _search_result(f"bbox({south},{west},{north},{east})", result)
+    
+    async def search_trails_bulk(
+        self,
+        bboxes: Sequence[Tuple[float, float, float, float]],
+        trail_types: Optional[Sequence[str]] = None,
+        concurrency: int = 8,
+        cache_ttl: Optional[float] = None
+    ) -> List[TrailSearchResult]:
+        """Search many (south, west, north, east) boxes, at most concurrency at a time.
+        
+        Results are returned in the order of bboxes. A box whose search fails gets a
+        result with error set, so one bad box doesn't abort the others.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
         
-        return TrailSearchResult(
-            location=f"bbox({south},{west},{north},{east})",
-            trail_count=0,
-            trail_types={},
-            trails=[],
-            raw_data=result
-        )
+        async def search_one(bbox: Tuple[float, float, float, float]) -> TrailSearchResult:
+            async with semaphore:
+                try:
+                    return await self.search_trails_by_coordinates(*bbox, trail_types=trail_types, cache_ttl=cache_ttl)
+                except Exception as e:
+                    logger.error("Error searching bbox %s: %s", bbox, e)
+                    error = f"Error searching trails: {e}"
+                    return _search_result("bbox({},{},{},{})".format(*bbox), error)
+        
+        return list(await asyncio.gather(*(search_one(bbox) for bbox in bboxes)))
     
     async def get_trail_statistics(
         self,
@@ -310,64 +576,86 @@ class TrailMcpClient:
         south: Optional[float] = None,
         west: Optional[float] = None,
         north: Optional[float] = None,
-        east: Optional[float] = None
+        east: Optional[float] = None,
+        cache_ttl: Optional[float] = None
     ) -> str:
         """Get trail statistics."""
-        arguments = {}
+        arguments: Dict[str, Any] = {}
         if location:
-            arguments["location"] = location
-        if all(coord is not None for coord in [south, west, north, east]):
-            arguments.update({
-                "south": south,
-                "west": west,
-                "north": north,
-                "east": east
-            })
+            arguments["area_name"] = location
+        if south is not None and west is not None and north is not None and east is not None:
+            arguments["south"] = south
+            arguments["west"] = west
+            arguments["north"] = north
+            arguments["east"] = east
         
         if not arguments:
             return "Error: Must provide either location or all coordinates"
         
-        return await self.call_tool("get_trail_statistics", arguments)
+        return await self.call_tool("get_trail_statistics", arguments, cache_ttl=cache_ttl)
     
     async def get_trail_types(self) -> str:
-        """Get information about supported trail types."""
-        return await self.read_resource("trails://types")
+        """Get information about supported trail types.
+        
+        The list is static on the server, so it is read once per session.
+        """
+        if self._trail_types_cache is None:
+            self._trail_types_cache = await self.read_resource("trails://types")
+        return self._trail_types_cache
     
     async def get_trails_bbox_resource(
         self,
         south: float,
         west: float,
         north: float,
-        east: float
+        east: float,
+        cache_ttl: Optional[float] = None
     ) -> str:
         """Get trails using the bbox resource."""
-        uri = f"trails://bbox/{south}/{west}/{north}/{east}"
-        return await self.read_resource(uri)
+        uri = AnyUrl(f"trails://bbox/{south}/{west}/{north}/{east}")
+        return await self.read_resource(uri, cache_ttl=cache_ttl)
     
-    async def get_trails_area_resource(self, area_name: str) -> str:
+    async def get_trails_area_resource(self, area_name: str, cache_ttl: Optional[float] = None) -> str:
         """Get trails using the area resource."""
         uri = f"trails://area/{area_name}"
-        return await self.read_resource(uri)
+        return await self.read_resource(uri, cache_ttl=cache_ttl)
     
     # Utility methods
-    async def get_server_info(self) -> Dict[str, Any]:
-        """Get comprehensive server information."""
-        if not self.capabilities:
-            await self._fetch_capabilities()
+    async def get_server_info(
+        self,
+        include: Sequence[str] = ("tools", "resources", "prompts"),
+        schemas: bool = True
+    ) -> Dict[str, Any]:
+        """Get server information.
         
-        if not self.capabilities:
-            return {"tools": [], "resources": [], "prompts": []}
+        Args:
+            include: Sections to return, any of "tools", "resources" and "prompts"
+            schemas: Include tool input schemas and prompt arguments
         
-        return {
-            "tools": [
-                {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "input_schema": tool.inputSchema
-                }
-                for tool in self.capabilities.tools
-            ],
-            "resources": [
+        The result is cached per selection until capabilities are fetched again,
+        so callers must treat it as read-only.
+        """
+        await self._ensure_capabilities()
+        cache_key = (tuple(include), schemas)
+        info = self._server_info_cache.get(cache_key)
+        if info is None:
+            info = {section: self._render_server_info(section, schemas) for section in include}
+            self._server_info_cache[cache_key] = info
+        return info
+    
+    def _render_server_info(self, section: str, schemas: bool) -> List[Dict[str, Any]]:
+        """Render one section of get_server_info from the loaded capabilities."""
+        assert self.capabilities is not None
+        if section == "tools":
+            tools = []
+            for tool in self.capabilities.tools:
+                entry: Dict[str, Any] = {"name": tool.name, "description": tool.description}
+                if schemas:
+                    entry["input_schema"] = tool.inputSchema
+                tools.append(entry)
+            return tools
+        if section == "resources":
+            return [
                 {
                     "uri": str(resource.uri),
                     "name": resource.name,
@@ -375,12 +663,13 @@ class TrailMcpClient:
                     "mime_type": resource.mimeType
                 }
                 for resource in self.capabilities.resources
-            ],
-            "prompts": [
-                {
-                    "name": prompt.name,
-                    "description": prompt.description,
-                    "arguments": [
+            ]
+        if section == "prompts":
+            prompts = []
+            for prompt in self.capabilities.prompts:
+                entry = {"name": prompt.name, "description": prompt.description}
+                if schemas:
+                    entry["arguments"] = [
                         {
                             "name": arg.name,
                             "description": arg.description,
@@ -388,7 +677,6 @@ class TrailMcpClient:
                         }
                         for arg in prompt.arguments
                     ] if prompt.arguments else []
-                }
-                for prompt in self.capabilities.prompts
-            ]
-        }
+                prompts.append(entry)
+            return prompts
+        raise ValueError(f"Unknown server info section: {section}")
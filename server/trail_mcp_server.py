@@ -8,16 +8,29 @@ This server provides:
 """
 import sys
 from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+import argparse
 import asyncio
+import hashlib
+import itertools
 import json
 import logging
-from typing import Dict, List, Optional, Any, Union
+import math
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
 import httpx
 from urllib.parse import quote
-from dataclasses import dataclass
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, replace
 from enum import Enum
+from functools import lru_cache
 import textwrap
+from contextlib import asynccontextmanager
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.prompts import base
@@ -26,20 +39,51 @@ from utils.logging_colors import setup_logger, SERVER_COLOR
 # Configure logging
 logger = setup_logger("trail_mcp_server", SERVER_COLOR, fmt="[SERVER] %(levelname)s: %(message)s")
 
+# Sessions currently inside the lifespan (streamable HTTP enters it once per session)
+_active_sessions = 0
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Release the shared Overpass HTTP client and disk cache when the last session ends.
+
+    Both are reopened on next use, so a later session starts cleanly.
+    """
+    global _active_sessions
+    _active_sessions += 1
+    try:
+        yield
+    finally:
+        _active_sessions -= 1
+        if _active_sessions == 0:
+            await close_client()
+            _disk_cache.close()
+
 # Create the MCP server
 mcp = FastMCP(
     "Trail Explorer",
-    dependencies=["httpx"]
+    dependencies=["httpx"],
+    lifespan=lifespan
 )
 
 # Configuration
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Config:
     """Configuration settings for the trails server."""
     overpass_url: str = "https://overpass-api.de/api/interpreter"
     timeout: float = 60.0
     max_trails_display: int = 50
     query_timeout: int = 30
+    cache_ttl: float = 3600.0  # Seconds an Overpass response is reused
+    cache_maxsize: int = 512  # Overpass responses kept in memory
+    bbox_precision: int = 3  # Decimals bounding boxes are snapped to
+    disk_cache: bool = False  # Persist Overpass responses across restarts (opt in with --disk-cache)
+    disk_cache_path: str = "~/.cache/trail-explorer/overpass.sqlite3"
+    disk_cache_ttl: float = 86400.0  # Seconds a persisted response is reused
+    max_concurrent_queries: int = 2  # Overpass allows about two concurrent queries per IP
+    max_retries: int = 3  # Retries when Overpass reports it is overloaded
+    retry_backoff: float = 1.0  # Seconds before the first retry, doubling each time
+    search_cache_ttl: float = 600.0  # Seconds a formatted coordinate search is reused
+    search_cache_maxsize: int = 128  # Formatted coordinate searches kept in memory
 
 config = Config()
 
@@ -72,6 +116,11 @@ TRAIL_TYPES = {
 }
 
 
+def _trail_types_key(trail_types: Sequence[str]) -> Tuple[str, ...]:
+    """Normalize a trail type selection so equivalent selections share cached queries and results."""
+    return tuple(sorted(set(trail_types)))
+
+
 class OverpassQueryBuilder:
     """Helper class to build Overpass API queries."""
 
@@ -86,9 +135,13 @@ class OverpassQueryBuilder:
     @staticmethod
     def build_bbox_query(
             south: float, west: float, north: float, east: float,
-            trail_types: Optional[List[str]] = None
+            trail_types: Optional[Sequence[str]] = None,
+            include_geometry: bool = False
     ) -> str:
-        """Build a query for trails within a bounding box."""
+        """Build a query for trails within a bounding box.
+
+        Trails are returned with tags and a center point, or full geometry if include_geometry.
+        """
         if trail_types is None:
             trail_types = list(TRAIL_TYPES.keys())
 
@@ -102,32 +155,20 @@ class OverpassQueryBuilder:
         if west >= east:
             raise ValueError("West longitude must be less than east longitude")
 
-        # Build the query parts
-        query_parts = [f"[out:json][timeout:{config.query_timeout}][maxsize:1073741824];", "("]
-
-        for trail_type in trail_types:
-            if trail_type in TRAIL_TYPES:
-                tags = TRAIL_TYPES[trail_type]
-                access_filters = OverpassQueryBuilder.build_access_filters(tags.get("access_exclude", []))
-
-                # Add route relations
-                for route_type in tags.get("route", []):
-                    query_parts.append(
-                        f'  relation["route"="{route_type}"]({south},{west},{north},{east});'
-                    )
-
-                # Add highway ways with access filtering
-                for highway_type in tags.get("highway", []):
-                    query_parts.append(
-                        f'  way["highway"="{highway_type}"]{access_filters}({south},{west},{north},{east});'
-                    )
-
-        query_parts.extend([");", "out geom;"])
-        return "\n".join(query_parts)
+        return _format_bbox_query(
+            tuple(trail_types), south, west, north, east, config.query_timeout, include_geometry
+        )
 
     @staticmethod
-    def build_area_query(area_name: str, trail_types: Optional[List[str]] = None) -> str:
-        """Build a query for trails within a named area."""
+    def build_area_query(
+            area_name: str,
+            trail_types: Optional[Sequence[str]] = None,
+            include_geometry: bool = False
+    ) -> str:
+        """Build a query for trails within a named area.
+
+        Trails are returned with tags and a center point, or full geometry if include_geometry.
+        """
         if trail_types is None:
             trail_types = list(TRAIL_TYPES.keys())
 
@@ -137,34 +178,127 @@ class OverpassQueryBuilder:
         # Sanitize area name for query
         sanitized_area = area_name.strip().replace('"', '\\"')
 
-        # Build area search - start with most specific (parks)
-        query_parts = [
-            f"[out:json][timeout:{config.query_timeout}][maxsize:1073741824];",
-            "(",
-            f'  area["name"="{sanitized_area}"]["leisure"="park"]->.searchArea;',
-            ");",
-            "("
-        ]
+        # Build area search - start with most specific (parks).
+        # Types are sorted so equivalent selections share one cached query and response.
+        area_stmt = f'  area["name"="{sanitized_area}"]["leisure"="park"]->.searchArea;'
+        return _area_query(area_stmt, _trail_types_key(trail_types), config.query_timeout, include_geometry)
 
-        for trail_type in trail_types:
-            if trail_type in TRAIL_TYPES:
-                tags = TRAIL_TYPES[trail_type]
-                access_filters = OverpassQueryBuilder.build_access_filters(tags.get("access_exclude", []))
 
-                # Add route relations
-                for route_type in tags.get("route", []):
-                    query_parts.append(
-                        f'  relation(area.searchArea)["route"="{route_type}"];'
-                    )
+# Overpass query pieces depend only on TRAIL_TYPES, so build them once at import
+_QUERY_HEADER = "[out:json][timeout:{timeout}][maxsize:67108864];"
+# The formatters only read tags, so skip node-by-node geometry unless it is asked for
+_OUT_TAGS = "out tags center;"
+_OUT_GEOMETRY = "out geom;"
 
-                # Add highway ways with access filtering
-                for highway_type in tags.get("highway", []):
-                    query_parts.append(
-                        f'  way(area.searchArea)["highway"="{highway_type}"]{access_filters};'
-                    )
 
-        query_parts.extend([");", "out geom;"])
-        return "\n".join(query_parts)
+def _trail_fragment(trail_type: str, relation: str, way: str, bounds: str) -> str:
+    """Build the query lines selecting one trail type's route relations and highway ways."""
+    tags = TRAIL_TYPES[trail_type]
+    access_filters = OverpassQueryBuilder.build_access_filters(tags.get("access_exclude", []))
+    lines = [f'  {relation}["route"="{route_type}"]{bounds};' for route_type in tags.get("route", [])]
+    lines += [f'  {way}["highway"="{highway_type}"]{access_filters}{bounds};' for highway_type in tags.get("highway", [])]
+    return "\n".join(lines)
+
+
+# Bbox fragments keep {s},{w},{n},{e} placeholders for str.format
+_BBOX_FRAGMENTS = {
+    trail_type: _trail_fragment(trail_type, "relation", "way", "({s},{w},{n},{e})")
+    for trail_type in TRAIL_TYPES
+}
+_AREA_FRAGMENTS = {
+    trail_type: _trail_fragment(trail_type, "relation(area.searchArea)", "way(area.searchArea)", "")
+    for trail_type in TRAIL_TYPES
+}
+
+
+@lru_cache(maxsize=1024)
+def _format_bbox_query(
+        trail_types: Tuple[str, ...], south: float, west: float, north: float, east: float, timeout: int,
+        include_geometry: bool = False
+) -> str:
+    """Assemble a bbox query from the precomputed fragments."""
+    query_parts = [_QUERY_HEADER.format(timeout=timeout), "("]
+    query_parts.extend(
+        _BBOX_FRAGMENTS[trail_type].format(s=south, w=west, n=north, e=east)
+        for trail_type in trail_types if trail_type in _BBOX_FRAGMENTS
+    )
+    query_parts.extend([");", _OUT_GEOMETRY if include_geometry else _OUT_TAGS])
+    return "\n".join(query_parts)
+
+
+@lru_cache(maxsize=256)
+def _area_query(
+        area_stmt: str, trail_types: Tuple[str, ...], timeout: int, include_geometry: bool = False
+) -> str:
+    """Assemble a query for trails inside the area that area_stmt stores in .searchArea."""
+    query_parts = [_QUERY_HEADER.format(timeout=timeout), "(", area_stmt, ");", "("]
+    query_parts.extend(
+        _AREA_FRAGMENTS[trail_type] for trail_type in trail_types if trail_type in _AREA_FRAGMENTS
+    )
+    query_parts.extend([");", _OUT_GEOMETRY if include_geometry else _OUT_TAGS])
+    return "\n".join(query_parts)
+
+
+# Named-area selectors from most to least specific, as (strategy name, extra tag filter)
+_AREA_STRATEGIES = (
+    ("park", '["leisure"="park"]'),
+    ("administrative", '["boundary"="administrative"]'),
+    ("any", ""),
+)
+# Type of the made-up element closing each strategy's section in a combined area query
+_STRATEGY_MARKER = "strategy"
+_STRATEGY_AREA_FRAGMENTS = {
+    name: {
+        trail_type: _trail_fragment(trail_type, f"relation(area.{name}_area)", f"way(area.{name}_area)", "")
+        for trail_type in TRAIL_TYPES
+    }
+    for name, _ in _AREA_STRATEGIES
+}
+
+
+@lru_cache(maxsize=256)
+def _area_strategies_query(sanitized_area: str, trail_types: Tuple[str, ...], timeout: int) -> str:
+    """Assemble one query answering every area strategy, each section closed by a marker element.
+
+    A section holds only trails the more specific strategies before it did not find,
+    so the first non-empty section is exactly what that strategy alone would return.
+    """
+    query_parts = [_QUERY_HEADER.format(timeout=timeout)]
+    query_parts.extend(
+        f'area["name"="{sanitized_area}"]{selector}->.{name}_area;' for name, selector in _AREA_STRATEGIES
+    )
+    # .seen collects the trails of the sections already output
+    for index, (name, _) in enumerate(_AREA_STRATEGIES):
+        query_parts.append("(")
+        query_parts.extend(
+            _STRATEGY_AREA_FRAGMENTS[name][trail_type]
+            for trail_type in trail_types if trail_type in _STRATEGY_AREA_FRAGMENTS[name]
+        )
+        if index == 0:
+            query_parts.extend([f")->.{name}_trails;", f".{name}_trails->.seen;"])
+        else:
+            query_parts.extend([f")->.{name}_found;", f"(.{name}_found; - .seen;)->.{name}_trails;"])
+            if index < len(_AREA_STRATEGIES) - 1:
+                query_parts.append(f"(.seen; .{name}_trails;)->.seen;")
+        query_parts.extend([
+            f".{name}_trails {_OUT_TAGS}",
+            f'make {_STRATEGY_MARKER} name="{name}";',
+            "out;"
+        ])
+    return "\n".join(query_parts)
+
+
+def _split_strategy_sections(data: Dict[str, Any]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Split a combined area response into (strategy name, elements) in strategy order."""
+    sections = []
+    elements: List[Dict[str, Any]] = []
+    for element in data.get("elements", []):
+        if element.get("type") == _STRATEGY_MARKER:
+            sections.append((element["tags"].get("name", ""), elements))
+            elements = []
+        else:
+            elements.append(element)
+    return sections
 
 
 class OverpassAPIError(Exception):
@@ -172,28 +306,313 @@ class OverpassAPIError(Exception):
     pass
 
 
+def snap_bbox(south: float, west: float, north: float, east: float) -> Tuple[float, float, float, float]:
+    """Round a bounding box outward to config.bbox_precision decimals.
+
+    Nearby boxes then produce the same query and share a cache entry. Boxes that are
+    not well-formed are returned unchanged so the query builder still rejects them.
+    """
+    if south >= north or west >= east:
+        return south, west, north, east
+    scale = 10 ** config.bbox_precision
+    # Round first so float noise (e.g. 40.7 * 1000 = 40700.000000000004) doesn't widen the box
+    return (
+        math.floor(round(south * scale, 6)) / scale,
+        math.floor(round(west * scale, 6)) / scale,
+        math.ceil(round(north * scale, 6)) / scale,
+        math.ceil(round(east * scale, 6)) / scale,
+    )
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire ttl seconds after they are stored."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        """Return the live value for key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any):
+        """Store value under key, evicting the least recently used entries past maxsize."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Parsed Overpass responses by query digest. Cached dicts are shared between callers,
+# so they must be treated as read-only.
+_query_cache = TTLCache(config.cache_maxsize, config.cache_ttl)
+# Fetches in progress, so concurrent identical queries share one request
+_inflight_queries: Dict[bytes, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+class DiskCache:
+    """Overpass responses persisted in SQLite, compressed, so they survive restarts.
+
+    Methods block and are meant to be run with asyncio.to_thread. Storage errors are
+    logged and treated as cache misses.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(query_hash BLOB PRIMARY KEY, response BLOB NOT NULL, ts REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Return the stored response for key if it is younger than ttl."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT response, ts FROM responses WHERE query_hash = ?", (key,)
+                ).fetchone()
+            if row is None or row[1] + self.ttl <= time.time():
+                return None
+            return json.loads(zlib.decompress(row[0]))
+        except (sqlite3.Error, OSError, zlib.error, ValueError) as e:
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+
+    def put(self, key: bytes, data: Dict[str, Any]):
+        """Store a response under key."""
+        try:
+            blob = zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, blob, time.time())
+                    )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Disk cache write failed: {e}")
+
+    def clear(self):
+        """Delete every stored response."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute("DELETE FROM responses")
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Disk cache clear failed: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_disk_cache = DiskCache(config.disk_cache_path, config.disk_cache_ttl)
+
+
+def invalidate_cache():
+    """Drop all cached Overpass responses, in memory and on disk."""
+    _query_cache.clear()
+    _search_cache.clear()
+    if config.disk_cache:
+        _disk_cache.clear()
+
+
+# Every query goes to the same Overpass endpoint, so share one pooled client
+OVERPASS_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared Overpass HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=config.timeout,
+            limits=OVERPASS_HTTP_LIMITS,
+            headers={"Content-Type": "text/plain"}
+        )
+    return _client
+
+
+# Bounds requests in flight to Overpass across all tools and clients. A semaphore is tied to
+# the event loop it first waits on, so one is made per loop (e.g. repeated asyncio.run calls)
+_overpass_semaphore: Optional[asyncio.Semaphore] = None
+_overpass_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_overpass_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent Overpass requests on the running event loop."""
+    global _overpass_semaphore, _overpass_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _overpass_semaphore is None or _overpass_semaphore_loop is not loop:
+        _overpass_semaphore = asyncio.Semaphore(config.max_concurrent_queries)
+        _overpass_semaphore_loop = loop
+    return _overpass_semaphore
+
+
+async def close_client():
+    """Close the shared Overpass HTTP client, if one was created."""
+    global _client
+    # Detach first so a session starting during aclose() gets a fresh client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
 async def query_overpass(query: str) -> Dict[str, Any]:
-    """Execute an Overpass API query."""
+    """Execute an Overpass API query.
+
+    Responses are cached for config.cache_ttl seconds and concurrent identical
+    queries share one request. The returned dict must not be modified.
+    """
+    key = hashlib.blake2b(query.encode(), digest_size=16).digest()
+    data = _query_cache.get(key)
+    if data is not None:
+        logger.info("Using cached Overpass response")
+        return data
+
+    task = _inflight_queries.get(key)
+    if task is None:
+        task = asyncio.create_task(_load_overpass(key, query))
+        _inflight_queries[key] = task
+        task.add_done_callback(lambda done: _store_query_result(key, done))
+    # Shield so one caller being cancelled doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+def _store_query_result(key: bytes, task: "asyncio.Task[Dict[str, Any]]"):
+    """Cache a finished fetch and stop tracking it as in flight."""
+    _inflight_queries.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        _query_cache.put(key, task.result())
+
+
+async def _load_overpass(key: bytes, query: str) -> Dict[str, Any]:
+    """Get a query's response from the disk cache, or fetch and persist it."""
+    if config.disk_cache:
+        data = await asyncio.to_thread(_disk_cache.get, key)
+        if data is not None:
+            logger.info("Using Overpass response from disk cache")
+            return data
+
+    data = await _fetch_overpass(query)
+    if config.disk_cache:
+        await asyncio.to_thread(_disk_cache.put, key, data)
+    return data
+
+
+# Element fields produced by "out tags center" and "out geom"
+_ELEMENT_FIELDS = ("type", "id", "tags", "center", "bounds", "geometry", "members")
+# Statuses Overpass returns when it is rate limiting or overloaded
+_RETRY_STATUSES = frozenset({429, 504})
+
+
+async def _fetch_overpass(query: str) -> Dict[str, Any]:
+    """POST a query to the Overpass API and parse the JSON response.
+
+    Overload responses are retried with exponential backoff.
+    """
     logger.info(f"Executing Overpass query: {query[:100]}...")
     
-    async with httpx.AsyncClient(timeout=config.timeout) as client:
-        try:
-            response = await client.post(
-                config.overpass_url,
-                content=query,  # Use content instead of data for string
-                headers={"Content-Type": "text/plain"}
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error during Overpass query: {e}")
-            raise OverpassAPIError(f"Overpass API error: {str(e)}")
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            raise OverpassAPIError("Invalid JSON response from Overpass API")
-        except Exception as e:
-            logger.error(f"Unexpected error during Overpass query: {e}")
-            raise OverpassAPIError(f"Unexpected error: {str(e)}")
+    client = get_client()
+    try:
+        for attempt in range(config.max_retries + 1):
+            async with get_overpass_semaphore():
+                response = await client.post(
+                    config.overpass_url,
+                    content=query  # Use content instead of data for string
+                )
+            if response.status_code not in _RETRY_STATUSES or attempt == config.max_retries:
+                break
+            # Back off outside the semaphore so other queries can use the slot
+            delay = config.retry_backoff * 2 ** attempt
+            logger.warning(f"Overpass returned {response.status_code}, retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        data = response.json()
+        # Keep only the fields our output modes ask for, and always a tags dict
+        data["elements"] = [
+            {"tags": {}, **{field: element[field] for field in _ELEMENT_FIELDS if field in element}}
+            for element in data.get("elements", [])
+        ]
+        return data
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error during Overpass query: {e}")
+        raise OverpassAPIError(f"Overpass API error: {str(e)}")
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON decode error: {e}")
+        raise OverpassAPIError("Invalid JSON response from Overpass API")
+    except Exception as e:
+        logger.error(f"Unexpected error during Overpass query: {e}")
+        raise OverpassAPIError(f"Unexpected error: {str(e)}")
+
+
+async def query_trail_types(
+        build_query: Callable[[List[str]], str],
+        trail_types: List[str]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Run one Overpass query per trail type concurrently and merge their elements.
+
+    build_query turns a list of trail types into a query. Returns the merged data and
+    the trail types whose subquery failed; OverpassAPIError is raised only if every
+    subquery fails.
+    """
+    queries = [build_query([trail_type]) for trail_type in trail_types]
+    results = await asyncio.gather(*(query_overpass(query) for query in queries), return_exceptions=True)
+
+    # Types share tags (e.g. highway=path), so drop elements already returned for another type
+    elements = []
+    seen = set()
+    errors = []
+    failed_types = []
+    for trail_type, result in zip(trail_types, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Overpass query for {trail_type} trails failed: {result}")
+            errors.append(result)
+            failed_types.append(trail_type)
+            continue
+        for element in result.get("elements", []):
+            element_key = (element.get("type"), element.get("id"))
+            if element_key not in seen:
+                seen.add(element_key)
+                elements.append(element)
+
+    if errors and len(errors) == len(results):
+        raise OverpassAPIError(f"All trail type queries failed: {errors[0]}")
+    return {"elements": elements}, failed_types
+
+
+def _failed_types_note(failed_types: List[str]) -> str:
+    """Explain which trail types are missing from a partial result ("" if none are)."""
+    if not failed_types:
+        return ""
+    return (
+        f"\n\nNote: the search for {', '.join(failed_types)} trails failed, "
+        "so they may be missing from these results. Try again later."
+    )
 
 
 def format_trail_data(data: Dict[str, Any]) -> str:
@@ -202,87 +621,162 @@ def format_trail_data(data: Dict[str, Any]) -> str:
     if not elements:
         return "No trails found in the specified area."
 
-    formatted_trails = []
-    trail_count = {trail_type: 0 for trail_type in TRAIL_TYPES.keys()}
+    details: List[str] = []
+    add_detail = details.append
+    trail_count: Counter = Counter()
+    max_display = config.max_trails_display
+    shown = 0
 
     for element in elements:
         tags = element.get("tags", {})
-        name = tags.get("name", "Unnamed trail")
         trail_type = identify_trail_type(tags)
 
         if trail_type:
             trail_count[trail_type] += 1
 
-            trail_info = [f"{name} ({trail_type.title()}"]
+            # Only the first max_display trails are shown, so don't format the rest
+            if shown >= max_display:
+                continue
+            if shown:
+                add_detail("\n")
+            shown += 1
+
+            add_detail(f"{tags.get('name', 'Unnamed trail')} ({trail_type.title()}")
 
             # Add additional info if available
             if "distance" in tags:
-                trail_info.append(f"Distance: {tags['distance']}")
+                add_detail(f" | Distance: {tags['distance']}")
             if "surface" in tags:
-                trail_info.append(f"Surface: {tags['surface']}")
+                add_detail(f" | Surface: {tags['surface']}")
             if "difficulty" in tags:
-                trail_info.append(f"Difficulty: {tags['difficulty']}")
+                add_detail(f" | Difficulty: {tags['difficulty']}")
             if "description" in tags:
-                trail_info.append(f"Description: {tags['description']}")
-
-            formatted_trails.append(" | ".join(trail_info) + ")")
+                add_detail(f" | Description: {tags['description']}")
+            add_detail(")")
 
     # Summary
-    summary = f"Found {len(elements)} trail elements:\n"
-    for trail_type, count in trail_count.items():
+    parts = [f"Found {len(elements)} trail elements:\n"]
+    for trail_type in TRAIL_TYPES:
+        count = trail_count[trail_type]
         if count > 0:
-            summary += f"- {trail_type.title()}: {count}\n"
-    summary += "\n"
+            parts.append(f"- {trail_type.title()}: {count}\n")
+    parts.append("\n")
 
     # Detailed trails
-    if formatted_trails:
-        summary += "Trail Details:\n" + "\n".join(formatted_trails[:config.max_trails_display])
-        if len(formatted_trails) > config.max_trails_display:
-            summary += f"\n... and {len(formatted_trails) - config.max_trails_display} more trails"
+    if shown:
+        total_trails = sum(trail_count.values())
+        parts.append("Trail Details:\n")
+        parts.extend(details)
+        if total_trails > max_display:
+            parts.append(f"\n... and {total_trails - max_display} more trails")
+
+    return "".join(parts)
+
+
+# Trail type by route relation value and by highway value
+_ROUTE_TO_TYPE = {
+    "hiking": TrailType.HIKING.value,
+    "foot": TrailType.HIKING.value,
+    "bicycle": TrailType.BIKING.value,
+    "mtb": TrailType.BIKING.value,
+    "walking": TrailType.WALKING.value,
+}
+_HIGHWAY_TO_TYPE = {
+    "cycleway": TrailType.BIKING.value,
+    "footway": TrailType.HIKING.value,
+    "pedestrian": TrailType.HIKING.value,
+    "path": TrailType.HIKING.value,
+    "track": TrailType.HIKING.value,
+}
+# Trail type by (tag key, tag value)
+_TRAIL_RULES: Dict[Tuple[str, str], str] = {
+    **{("route", value): trail_type for value, trail_type in _ROUTE_TO_TYPE.items()},
+    ("bicycle", "yes"): TrailType.BIKING.value,
+    **{("highway", value): trail_type for value, trail_type in _HIGHWAY_TO_TYPE.items()},
+    ("foot", "yes"): TrailType.HIKING.value,
+}
+
+
+@lru_cache(maxsize=4096)
+def _classify(route: str, highway: str, bicycle: str, foot: str) -> Optional[str]:
+    """Classify a trail from its route, highway, bicycle and foot tag values."""
+    # Route relations win, then bicycle access (path/track may be either), then highway, then foot access
+    for rule in (("route", route), ("bicycle", bicycle), ("highway", highway), ("foot", foot)):
+        trail_type = _TRAIL_RULES.get(rule)
+        if trail_type:
+            return trail_type
+    return None
+
 
-    return summary
+# Precomputed classification of the tag combinations our queries return;
+# anything else falls back to _classify
+_CLASSIFY: Dict[Tuple[str, str, str, str], Optional[str]] = {
+    key: _classify(*key)
+    for key in itertools.product(
+        ["", *_ROUTE_TO_TYPE],
+        ["", "bridleway", "steps", *_HIGHWAY_TO_TYPE],
+        ["", "yes", "no", "designated", "permissive"],
+        ["", "yes", "no", "designated", "permissive"],
+    )
+}
 
 
 def identify_trail_type(tags: Dict[str, str]) -> Optional[str]:
     """Identify the type of trail based on OSM tags."""
-    route = tags.get("route", "")
-    highway = tags.get("highway", "")
-
-    # Check for specific route types
-    if route in ["hiking", "foot"]:
-        return TrailType.HIKING.value
-    elif route in ["bicycle", "mtb"]:
-        return TrailType.BIKING.value
-    elif route in ["walking"]:
-        return TrailType.WALKING.value
-
-    # Check highway types
-    if highway in ["cycleway"] or tags.get("bicycle") == "yes":
-        return TrailType.BIKING.value
-    elif highway in ["footway", "pedestrian"] or tags.get("foot") == "yes":
-        return TrailType.HIKING.value
-    elif highway in ["path", "track"]:
-        # Path/track could be either - check additional tags
-        if tags.get("bicycle") == "yes":
-            return TrailType.BIKING.value
-        else:
-            return TrailType.HIKING.value
-
-    return None
+    key = (tags.get("route", ""), tags.get("highway", ""), tags.get("bicycle", ""), tags.get("foot", ""))
+    if key in _CLASSIFY:
+        return _CLASSIFY[key]
+    return _classify(*key)
 
 
 def validate_trail_types(trail_types: Optional[List[str]]) -> List[str]:
     """Validate and return valid trail types."""
+    return list(_validate_trail_types(None if trail_types is None else tuple(trail_types)))
+
+
+_VALID_TRAIL_TYPES = frozenset(trail_type.value for trail_type in TrailType)
+# Tuple in TrailType order so the default query text is stable
+_DEFAULT_TRAIL_TYPES = tuple(trail_type.value for trail_type in TrailType)
+
+
+@lru_cache(maxsize=32)
+def _validate_trail_types(trail_types: Optional[Tuple[str, ...]]) -> Tuple[str, ...]:
+    """Cached validate_trail_types over hashable tuples."""
     if trail_types is None:
-        return list(TRAIL_TYPES.keys())
+        return _DEFAULT_TRAIL_TYPES
     
-    valid_types = [t for t in trail_types if t in TRAIL_TYPES]
+    # Unknown types are dropped rather than rejected, so one stray value from a caller still searches
+    valid_types = tuple(t for t in trail_types if t in _VALID_TRAIL_TYPES)
     if not valid_types:
         raise ValueError("No valid trail types specified. Use: hiking, biking, or walking")
     
     return valid_types
 
 
+# Formatted search_trails_by_coordinates results by snapped bbox and trail types
+_search_cache = TTLCache(config.search_cache_maxsize, config.search_cache_ttl)
+
+
+async def _search_trails_in_bbox(
+        south: float, west: float, north: float, east: float, trail_types: Tuple[str, ...]
+) -> str:
+    """Search and format trails in a bbox, reusing a recent identical search."""
+    key = (south, west, north, east, trail_types)
+    result = _search_cache.get(key)
+    if result is None:
+        data, failed_types = await query_trail_types(
+            lambda types: OverpassQueryBuilder.build_bbox_query(south, west, north, east, types),
+            list(trail_types)
+        )
+        result = format_trail_data(data)
+        if failed_types:
+            # Not cached, so the next identical search retries the failed types
+            result += _failed_types_note(failed_types)
+        else:
+            _search_cache.put(key, result)
+    return result
+
+
 # Tools
 @mcp.tool()
 async def search_trails_by_coordinates(
@@ -303,10 +797,9 @@ async def search_trails_by_coordinates(
         trail_types: List of trail types to search for (hiking, biking, walking)
     """
     try:
-        valid_types = validate_trail_types(trail_types)
-        query = OverpassQueryBuilder.build_bbox_query(south, west, north, east, valid_types)
-        data = await query_overpass(query)
-        return format_trail_data(data)
+        valid_types = _trail_types_key(_validate_trail_types(None if trail_types is None else tuple(trail_types)))
+        south, west, north, east = snap_bbox(south, west, north, east)
+        return await _search_trails_in_bbox(south, west, north, east, valid_types)
     except Exception as e:
         logger.error(f"Error in search_trails_by_coordinates: {e}")
         return f"Error searching trails: {str(e)}"
@@ -325,59 +818,45 @@ async def search_trails_by_area_name(
         trail_types: List of trail types to search for (hiking, biking, walking)
     """
     try:
-        valid_types = validate_trail_types(trail_types)
+        valid_types = _trail_types_key(validate_trail_types(trail_types))
         
         # Try different area search strategies in order of specificity
         sanitized_area = area_name.strip().replace('"', '\\"')
         search_strategies = [
-            ("park", f'area["name"="{sanitized_area}"]["leisure"="park"]->.searchArea;'),
-            ("administrative", f'area["name"="{sanitized_area}"]["boundary"="administrative"]->.searchArea;'),
-            ("any", f'area["name"="{sanitized_area}"]->.searchArea;')
+            (name, f'area["name"="{sanitized_area}"]{selector}->.searchArea;')
+            for name, selector in _AREA_STRATEGIES
         ]
         
-        for strategy_name, area_query in search_strategies:
+        async def run_strategy(strategy_name: str, area_query: str) -> Optional[Dict[str, Any]]:
             try:
                 logger.info(f"Trying {strategy_name} strategy for area: {area_name}")
-                
-                # Build query with this strategy
-                query_parts = [
-                    f"[out:json][timeout:{config.query_timeout}][maxsize:1073741824];",
-                    "(",
-                    area_query,
-                    ");",
-                    "("
-                ]
-
-                for trail_type in valid_types:
-                    if trail_type in TRAIL_TYPES:
-                        tags = TRAIL_TYPES[trail_type]
-                        access_filters = OverpassQueryBuilder.build_access_filters(tags.get("access_exclude", []))
-
-                        # Add route relations
-                        for route_type in tags.get("route", []):
-                            query_parts.append(
-                                f'  relation(area.searchArea)["route"="{route_type}"];'
-                            )
-
-                        # Add highway ways with access filtering
-                        for highway_type in tags.get("highway", []):
-                            query_parts.append(
-                                f'  way(area.searchArea)["highway"="{highway_type}"]{access_filters};'
-                            )
-
-                query_parts.extend([");", "out geom;"])
-                query = "\n".join(query_parts)
-                
-                data = await query_overpass(query)
-                
-                # If we get results, return them
-                if data.get("elements"):
-                    logger.info(f"Found results using {strategy_name} strategy")
-                    return format_trail_data(data)
+                query = _area_query(area_query, valid_types, config.query_timeout)
+                return await query_overpass(query)
                     
             except Exception as e:
                 logger.warning(f"Strategy {strategy_name} failed for {area_name}: {e}")
-                continue
+                return None
+        
+        # Answer every strategy in a single request, preferring the most specific one that found trails
+        try:
+            data = await query_overpass(
+                _area_strategies_query(sanitized_area, valid_types, config.query_timeout)
+            )
+        except Exception as e:
+            logger.warning(f"Combined search failed for {area_name}, trying strategies separately: {e}")
+        else:
+            for strategy_name, elements in _split_strategy_sections(data):
+                if elements:
+                    logger.info(f"Found results using {strategy_name} strategy")
+                    return format_trail_data({"elements": elements})
+            return "No trails found in the specified area after trying multiple search strategies."
+        
+        # Fall back to the separate strategies, preferring the most specific one that found trails
+        results = await asyncio.gather(*(run_strategy(name, query) for name, query in search_strategies))
+        for (strategy_name, _), data in zip(search_strategies, results):
+            if data and data.get("elements"):
+                logger.info(f"Found results using {strategy_name} strategy")
+                return format_trail_data(data)
         
         # If all strategies failed, return no results
         return "No trails found in the specified area after trying multiple search strategies."
@@ -407,75 +886,62 @@ async def get_trail_statistics(
     """
     try:
         if area_name:
-            query = OverpassQueryBuilder.build_area_query(area_name)
-        elif all(coord is not None for coord in [south, west, north, east]):
-            # Since we've validated all coordinates are not None, we can safely cast them
-            assert south is not None and west is not None and north is not None and east is not None
-            query = OverpassQueryBuilder.build_bbox_query(
-                south=south, west=west, north=north, east=east
-            )
+            def build_query(types: List[str]) -> str:
+                return OverpassQueryBuilder.build_area_query(area_name, types)
+        elif south is not None and west is not None and north is not None and east is not None:
+            south, west, north, east = snap_bbox(south, west, north, east)
+            def build_query(types: List[str]) -> str:
+                return OverpassQueryBuilder.build_bbox_query(
+                    south=south, west=west, north=north, east=east, trail_types=types
+                )
         else:
             return "Please provide either an area name or all four coordinates (south, west, north, east)"
 
-        data = await query_overpass(query)
+        data, failed_types = await query_trail_types(build_query, list(TRAIL_TYPES.keys()))
         elements = data.get("elements", [])
 
         if not elements:
-            return "No trail data found for the specified area."
-
-        # Count by type and collect statistics
-        stats = {trail_type: 0 for trail_type in TRAIL_TYPES.keys()}
-        stats["unknown"] = 0
-        surfaces = {}
-        difficulties = {}
-
-        for element in elements:
-            tags = element.get("tags", {})
-            trail_type = identify_trail_type(tags)
+            return "No trail data found for the specified area." + _failed_types_note(failed_types)
 
-            if trail_type:
-                stats[trail_type] += 1
-            else:
-                stats["unknown"] += 1
-
-            # Surface statistics
-            surface = tags.get("surface", "unknown")
-            surfaces[surface] = surfaces.get(surface, 0) + 1
-
-            # Difficulty statistics
-            difficulty = tags.get("difficulty", "unknown")
-            difficulties[difficulty] = difficulties.get(difficulty, 0) + 1
+        # Count by type and collect statistics; Counter tallies in C and keeps first-seen order for ties
+        all_tags = [element.get("tags", {}) for element in elements]
+        type_counts = Counter(map(identify_trail_type, all_tags))
+        stats = {trail_type: type_counts[trail_type] for trail_type in TRAIL_TYPES}
+        stats["unknown"] = type_counts[None]
+        surfaces = Counter([tags.get("surface", "unknown") for tags in all_tags])
+        difficulties = Counter([tags.get("difficulty", "unknown") for tags in all_tags])
 
         # Format results
-        result = f"Trail Statistics:\n\n"
-        result += f"Total elements: {len(elements)}\n\n"
+        parts = ["Trail Statistics:\n\n", f"Total elements: {len(elements)}\n\n"]
 
-        result += "By Type:\n"
+        parts.append("By Type:\n")
         for trail_type, count in stats.items():
             if count > 0:
-                result += f"- {trail_type.title()}: {count}\n"
+                parts.append(f"- {trail_type.title()}: {count}\n")
 
-        result += "\nBy Surface:\n"
-        for surface, count in sorted(surfaces.items(), key=lambda x: x[1], reverse=True)[:10]:
-            result += f"- {surface}: {count}\n"
+        parts.append("\nBy Surface:\n")
+        for surface, count in surfaces.most_common(10):
+            parts.append(f"- {surface}: {count}\n")
 
-        result += "\nBy Difficulty:\n"
-        for difficulty, count in sorted(difficulties.items(), key=lambda x: x[1], reverse=True):
+        parts.append("\nBy Difficulty:\n")
+        for difficulty, count in difficulties.most_common():
             if difficulty != "unknown":
-                result += f"- {difficulty}: {count}\n"
+                parts.append(f"- {difficulty}: {count}\n")
 
-        return result
+        parts.append(_failed_types_note(failed_types))
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error in get_trail_statistics: {e}")
         return f"Error getting trail statistics: {str(e)}"
 
 # Resources
 @mcp.resource("trails://bbox/{south}/{west}/{north}/{east}")
-def get_trails_bbox(south: float, west: float, north: float, east: float) -> str:
+async def get_trails_bbox(south: float, west: float, north: float, east: float) -> str:
     """Get trails within a bounding box (south, west, north, east coordinates)."""
     try:
+        south, west, north, east = snap_bbox(float(south), float(west), float(north), float(east))
         query = OverpassQueryBuilder.build_bbox_query(south, west, north, east)
-        data = asyncio.run(query_overpass(query))
+        data = await query_overpass(query)
         return format_trail_data(data)
     except Exception as e:
         logger.error(f"Error in get_trails_bbox: {e}")
@@ -483,11 +949,11 @@ def get_trails_bbox(south: float, west: float, north: float, east: float) -> str
 
 
 @mcp.resource("trails://area/{area_name}")
-def get_trails_area(area_name: str) -> str:
+async def get_trails_area(area_name: str) -> str:
     """Get trails within a named area (city, park, region)."""
     try:
         query = OverpassQueryBuilder.build_area_query(area_name)
-        data = asyncio.run(query_overpass(query))
+        data = await query_overpass(query)
         return format_trail_data(data)
     except Exception as e:
         logger.error(f"Error in get_trails_area: {e}")
@@ -497,26 +963,24 @@ def get_trails_area(area_name: str) -> str:
 @mcp.resource("trails://types")
 def get_trail_types() -> str:
     """Get information about supported trail types and their OSM mappings."""
-    info = "Supported Trail Types:\n\n"
+    parts = ["Supported Trail Types:\n\n"]
 
     for trail_type, tags in TRAIL_TYPES.items():
-        info += f"{trail_type.title()}:\n"
-        info += f"- Route types: {', '.join(tags.get('route', []))}\n"
-        info += f"- Highway types: {', '.join(tags.get('highway', []))}\n"
+        parts.append(f"{trail_type.title()}:\n")
+        parts.append(f"- Route types: {', '.join(tags.get('route', []))}\n")
+        parts.append(f"- Highway types: {', '.join(tags.get('highway', []))}\n")
         if 'foot' in tags:
-            info += f"- Foot access: {tags['foot']}\n"
+            parts.append(f"- Foot access: {tags['foot']}\n")
         if 'bicycle' in tags:
-            info += f"- Bicycle access: {tags['bicycle']}\n"
-        info += "\n"
+            parts.append(f"- Bicycle access: {tags['bicycle']}\n")
+        parts.append("\n")
 
-    return info
+    return "".join(parts)
 
 
 # Prompts
-@mcp.prompt()
-def find_trails_near_city(city: str) -> str:
-    """Generate a prompt to find trails near a specific city."""
-    return textwrap.dedent(f"""
+# Templates are dedented once at import and filled with str.format per call
+_FIND_TRAILS_NEAR_CITY_PROMPT = textwrap.dedent("""
         Please help me find trails near {city}. I'm interested in:
 
         1. What types of trails are available (hiking, biking, walking)
@@ -530,9 +994,12 @@ def find_trails_near_city(city: str) -> str:
 
 
 @mcp.prompt()
-def compare_trail_areas(area1: str, area2: str) -> str:
-    """Generate a prompt to compare trails between two areas."""
-    return textwrap.dedent(f"""
+def find_trails_near_city(city: str) -> str:
+    """Generate a prompt to find trails near a specific city."""
+    return _FIND_TRAILS_NEAR_CITY_PROMPT.format(city=city)
+
+
+_COMPARE_TRAIL_AREAS_PROMPT = textwrap.dedent("""
         Please compare the trail options between {area1} and {area2}. For each area, provide:
 
         1. Total number of trails by type (hiking, biking, walking)
@@ -546,9 +1013,12 @@ def compare_trail_areas(area1: str, area2: str) -> str:
 
 
 @mcp.prompt()
-def plan_trail_adventure(trail_type: str, location: str) -> str:
-    """Generate a prompt to plan a trail adventure."""
-    return textwrap.dedent(f"""
+def compare_trail_areas(area1: str, area2: str) -> str:
+    """Generate a prompt to compare trails between two areas."""
+    return _COMPARE_TRAIL_AREAS_PROMPT.format(area1=area1, area2=area2)
+
+
+_PLAN_TRAIL_ADVENTURE_PROMPT = textwrap.dedent("""
         I want to plan a {trail_type} adventure in {location}. Please help me by:
 
         1. Finding all {trail_type} trails in the area
@@ -563,9 +1033,12 @@ def plan_trail_adventure(trail_type: str, location: str) -> str:
 
 
 @mcp.prompt()
-def trail_surface_analysis(location: str) -> str:
-    """Generate a prompt for trail surface analysis."""
-    return textwrap.dedent(f"""
+def plan_trail_adventure(trail_type: str, location: str) -> str:
+    """Generate a prompt to plan a trail adventure."""
+    return _PLAN_TRAIL_ADVENTURE_PROMPT.format(trail_type=trail_type, location=location)
+
+
+_TRAIL_SURFACE_ANALYSIS_PROMPT = textwrap.dedent("""
         I'm planning to visit {location} and want to understand what types of trail surfaces I can expect.
 
         Please analyze the trail surfaces in {location} by:
@@ -582,9 +1055,12 @@ def trail_surface_analysis(location: str) -> str:
 
 
 @mcp.prompt()
-def beginner_trail_recommendations(location: str) -> str:
-    """Generate a prompt for beginner trail recommendations."""
-    return textwrap.dedent(f"""
+def trail_surface_analysis(location: str) -> str:
+    """Generate a prompt for trail surface analysis."""
+    return _TRAIL_SURFACE_ANALYSIS_PROMPT.format(location=location)
+
+
+_BEGINNER_TRAIL_RECOMMENDATIONS_PROMPT = textwrap.dedent("""
         I'm new to outdoor activities and looking for beginner-friendly trails in {location}.
 
         Please help me find:
@@ -601,9 +1077,12 @@ def beginner_trail_recommendations(location: str) -> str:
 
 
 @mcp.prompt()
-def advanced_trail_challenge(location: str, activity: str) -> str:
-    """Generate a prompt for advanced trail challenges."""
-    return textwrap.dedent(f"""
+def beginner_trail_recommendations(location: str) -> str:
+    """Generate a prompt for beginner trail recommendations."""
+    return _BEGINNER_TRAIL_RECOMMENDATIONS_PROMPT.format(location=location)
+
+
+_ADVANCED_TRAIL_CHALLENGE_PROMPT = textwrap.dedent("""
         I'm an experienced {activity} enthusiast looking for challenging trails in {location}.
 
         Please help me find:
@@ -620,9 +1099,12 @@ def advanced_trail_challenge(location: str, activity: str) -> str:
 
 
 @mcp.prompt()
-def family_trail_outing(location: str) -> str:
-    """Generate a prompt for family trail outings."""
-    return textwrap.dedent(f"""
+def advanced_trail_challenge(location: str, activity: str) -> str:
+    """Generate a prompt for advanced trail challenges."""
+    return _ADVANCED_TRAIL_CHALLENGE_PROMPT.format(location=location, activity=activity)
+
+
+_FAMILY_TRAIL_OUTING_PROMPT = textwrap.dedent("""
         I'm planning a family outing in {location} and need trails suitable for all ages.
 
         Please help me find:
@@ -639,9 +1121,12 @@ def family_trail_outing(location: str) -> str:
 
 
 @mcp.prompt()
-def seasonal_trail_planning(location: str, season: str) -> str:
-    """Generate a prompt for seasonal trail planning."""
-    return textwrap.dedent(f"""
+def family_trail_outing(location: str) -> str:
+    """Generate a prompt for family trail outings."""
+    return _FAMILY_TRAIL_OUTING_PROMPT.format(location=location)
+
+
+_SEASONAL_TRAIL_PLANNING_PROMPT = textwrap.dedent("""
         I'm planning a {season} visit to {location} and want to know what trails are best for this season.
 
         Please help me understand:
@@ -658,9 +1143,12 @@ def seasonal_trail_planning(location: str, season: str) -> str:
 
 
 @mcp.prompt()
-def trail_accessibility_analysis(location: str) -> str:
-    """Generate a prompt for trail accessibility analysis."""
-    return textwrap.dedent(f"""
+def seasonal_trail_planning(location: str, season: str) -> str:
+    """Generate a prompt for seasonal trail planning."""
+    return _SEASONAL_TRAIL_PLANNING_PROMPT.format(location=location, season=season)
+
+
+_TRAIL_ACCESSIBILITY_ANALYSIS_PROMPT = textwrap.dedent("""
         I'm looking for accessible trails in {location} that accommodate different mobility needs.
 
         Please help me find:
@@ -677,9 +1165,12 @@ def trail_accessibility_analysis(location: str) -> str:
 
 
 @mcp.prompt()
-def multi_activity_trail_planning(location: str) -> str:
-    """Generate a prompt for multi-activity trail planning."""
-    return textwrap.dedent(f"""
+def trail_accessibility_analysis(location: str) -> str:
+    """Generate a prompt for trail accessibility analysis."""
+    return _TRAIL_ACCESSIBILITY_ANALYSIS_PROMPT.format(location=location)
+
+
+_MULTI_ACTIVITY_TRAIL_PLANNING_PROMPT = textwrap.dedent("""
         I'm planning a trip to {location} and want to experience different types of trail activities.
 
         Please help me plan:
@@ -695,5 +1186,26 @@ def multi_activity_trail_planning(location: str) -> str:
     """)
 
 
+@mcp.prompt()
+def multi_activity_trail_planning(location: str) -> str:
+    """Generate a prompt for multi-activity trail planning."""
+    return _MULTI_ACTIVITY_TRAIL_PLANNING_PROMPT.format(location=location)
+
+
 if __name__ == "__main__":
-    mcp.run()
+    parser = argparse.ArgumentParser(description="Trail Explorer MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "sse", "streamable-http"],
+        default="stdio",
+        help="Transport to serve on (default: stdio)"
+    )
+    parser.add_argument(
+        "--disk-cache",
+        action="store_true",
+        help="Reuse Overpass responses across restarts via an on-disk cache"
+    )
+    args = parser.parse_args()
+    if args.disk_cache:
+        config = replace(config, disk_cache=True)
+    mcp.run(transport=args.transport)
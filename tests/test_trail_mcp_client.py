@@ -10,9 +10,42 @@ import os
 from pathlib import Path
 
 # Add the project root to sys.path
-sys.path.append(str(Path(__file__).parent))
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from client.trail_mcp_client import TrailMcpClient
+from client.trail_mcp_client import TrailMcpClient, _parse_trail_summary, _search_result
+
+
+def test_parse_trail_summary():
+    """Test parsing of the server's formatted trail summaries."""
+    print("\nTesting trail summary parsing...")
+    
+    summary = (
+        "Found 2 trail elements:\n"
+        "- Hiking: 1\n"
+        "- Biking: 1\n"
+        "\n"
+        "Trail Details:\n"
+        "Ridge Loop (Hiking | Distance: 5 km | Description: Steep | rocky | views)\n"
+        "River Path (Biking | Surface: gravel)\n"
+    )
+    trail_count, trail_types, trails = _parse_trail_summary(summary)
+    assert trail_count == 2
+    assert trail_types == {"hiking": 1, "biking": 1}
+    assert trails == [
+        {"name": "Ridge Loop", "type": "hiking", "distance": "5 km", "description": "Steep | rocky | views"},
+        {"name": "River Path", "type": "biking", "surface": "gravel"},
+    ]
+    print("PASS: Descriptions containing ' | ' are kept whole")
+    
+    assert _parse_trail_summary("No trails found in the specified area.") == (0, {}, [])
+    error = "Error searching trails: Overpass API error: 504"
+    assert _parse_trail_summary(error) is None
+    result = _search_result("Central Park", error)
+    assert result.error == result.raw_data == error
+    assert result.trail_count == 0
+    print("PASS: Server errors are flagged instead of parsed as no trails")
 
 
 async def demo_client():
@@ -81,4 +114,5 @@ async def demo_client():
 
 
 if __name__ == "__main__":
+    test_parse_trail_summary()
     asyncio.run(demo_client()) 
\ No newline at end of file
@@ -6,16 +6,25 @@ This script tests the basic functionality of the enhanced trail server.
 """
 
 import asyncio
+import hashlib
+import json
 import sys
 import os
+import re
+import time
+from dataclasses import FrozenInstanceError, replace
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 # Add the project root to sys.path
-sys.path.append(str(Path(__file__).parent.parent))
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from server.trail_mcp_server import (
     OverpassQueryBuilder,
     query_overpass,
+    close_client,
     format_trail_data,
     identify_trail_type,
     validate_trail_types,
@@ -130,10 +139,23 @@ def test_configuration():
     
     # Test default config
     config = Config()
-    assert config.overpass_url == "https://overpass-api.de/api/interpreter"
-    assert config.timeout == 60.0
-    assert config.max_trails_display == 50
-    assert config.query_timeout == 30
+    assert config == Config(
+        overpass_url="https://overpass-api.de/api/interpreter",
+        timeout=60.0,
+        max_trails_display=50,
+        query_timeout=30,
+        cache_ttl=3600.0,
+        cache_maxsize=512,
+        bbox_precision=3,
+        disk_cache=False,
+        disk_cache_path="~/.cache/trail-explorer/overpass.sqlite3",
+        disk_cache_ttl=86400.0,
+        max_concurrent_queries=2,
+        max_retries=3,
+        retry_backoff=1.0,
+        search_cache_ttl=600.0,
+        search_cache_maxsize=128
+    )
     print("PASS: Default configuration loaded")
     
     # Test custom config
@@ -143,24 +165,107 @@ def test_configuration():
     )
     assert custom_config.timeout == 30.0
     assert custom_config.max_trails_display == 10
+    assert custom_config == replace(config, timeout=30.0, max_trails_display=10)
     print("PASS: Custom configuration working")
     
+    # Settings are shared by the whole server, so they can't be changed in place
+    try:
+        config.timeout = 10.0
+    except FrozenInstanceError:
+        print("PASS: Configuration is immutable")
+    else:
+        raise AssertionError("Config fields should not be assignable")
+    
     return True
 
 
+# Trail type selection shared by the biking queries
+BIKING_ONLY = ("biking",)
+
+# Trail-type keywords the biking query assertions look for, collected in one scan
+BIKING_TOKENS_RE = re.compile(r"bicycle|cycleway|route|foot|hiking")
+
+BIKING_ROUTES = frozenset({"bicycle", "mtb"})
+
+
+def is_biking(element: Dict[str, Any]) -> bool:
+    """Check whether an Overpass way or relation is tagged as a biking trail."""
+    if element.get("type") not in ("way", "relation"):
+        return False
+    tags = element.get("tags") or {}
+    return (tags.get("route") in BIKING_ROUTES or
+            tags.get("highway") == "cycleway" or
+            tags.get("bicycle") == "yes")
+
+# Successful Overpass responses are replayed from here for a day; set TRAIL_TEST_REFRESH=1 to refetch
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+FIXTURE_TTL = 86400
+
+
+async def load_or_fetch(query: str, fixture_dir: Path = FIXTURES_DIR, ttl_s: float = FIXTURE_TTL) -> Dict[str, Any]:
+    """Return a fresh saved response for query, or run it against Overpass and save the result."""
+    fixture = fixture_dir / f"{hashlib.sha1(query.encode()).hexdigest()}.json"
+    refresh = os.environ.get("TRAIL_TEST_REFRESH") == "1"
+    if not refresh and fixture.exists() and time.time() - fixture.stat().st_mtime < ttl_s:
+        print(f"Using saved Overpass response {fixture.name}")
+        with fixture.open() as f:
+            return json.load(f)
+    
+    data = await query_overpass(query)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    with fixture.open("w") as f:
+        json.dump(data, f)
+    return data
+
+
+# Type of the made-up element separating the two result sets in the combined network query
+SECTION_MARKER = "test_section"
+# Per-test limit, so a stalled Overpass response can't hold up the whole suite
+ASYNC_TEST_TIMEOUT = 15.0
+_network_results: Optional["asyncio.Future[Tuple[Dict[str, Any], Dict[str, Any]]]"] = None
+
+
+def get_network_results() -> "asyncio.Future[Tuple[Dict[str, Any], Dict[str, Any]]]":
+    """Get the (bbox, area) results for the network tests, fetched once for both.
+
+    Callers await it through asyncio.shield so one test timing out doesn't cancel the shared fetch.
+    """
+    global _network_results
+    if _network_results is None:
+        _network_results = asyncio.ensure_future(fetch_network_results())
+    return _network_results
+
+
+async def fetch_network_results() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Run the bbox and Central Park area queries as one Overpass request and split the results."""
+    bbox_query = OverpassQueryBuilder.build_bbox_query(
+        south=40.7, west=-74.0, north=40.8, east=-73.9,
+        trail_types=BIKING_ONLY
+    )
+    area_query = OverpassQueryBuilder.build_area_query("Central Park", BIKING_ONLY)
+    
+    # Both queries share the settings line; keep one and join the bodies around a marker element
+    header, bbox_body = bbox_query.split("\n", 1)
+    _, area_body = area_query.split("\n", 1)
+    query = "\n".join([header, bbox_body, f'make {SECTION_MARKER} name="area";', "out;", area_body])
+    print(f"query: {query}")
+    
+    data = await load_or_fetch(query)
+    elements = data["elements"]
+    split = next(
+        (index for index, element in enumerate(elements) if element.get("type") == SECTION_MARKER),
+        len(elements)
+    )
+    return {"elements": elements[:split]}, {"elements": elements[split + 1:]}
+
+
 async def test_overpass_query():
     """Test actual Overpass API query (optional)."""
     print("\nTesting Overpass API query...")
     
     # This is optional and depends on internet connectivity
     try:
-        query = OverpassQueryBuilder.build_bbox_query(
-            south=40.7, west=-74.0, north=40.8, east=-73.9,
-            trail_types=["biking"]
-        )
-
-        print(f"query: {query}")
-        data = await query_overpass(query)
+        data, _ = await asyncio.shield(get_network_results())
         print("elements:", data["elements"][0:5])
         
         if "elements" in data:
@@ -182,17 +287,18 @@ async def test_area_query_biking_trails():
     try:
         query = OverpassQueryBuilder.build_area_query(
             "Central Park",
-            trail_types=["biking"]
+            trail_types=BIKING_ONLY
         )
         print("PASS: Biking area query built successfully")
         
         # Validate that the query contains biking-specific elements
-        assert "bicycle" in query or "cycleway" in query, "Query should contain biking elements"
-        assert "route" in query, "Query should contain route elements"
+        found = set(BIKING_TOKENS_RE.findall(query))
+        assert {"bicycle", "cycleway"} & found, "Query should contain biking elements"
+        assert "route" in found, "Query should contain route elements"
         print("PASS: Query contains biking-specific elements")
         
         # Check that it doesn't contain other trail types
-        assert "hiking" not in query or "foot" not in query, "Query should not contain hiking elements"
+        assert not {"foot", "hiking"} & found, "Query should not contain hiking elements"
         print("PASS: Query correctly filters for biking only")
         
     except Exception as e:
@@ -203,7 +309,7 @@ async def test_area_query_biking_trails():
     test_areas = ["Golden Gate Park", "Yosemite National Park", "Central Park"]
     for area in test_areas:
         try:
-            query = OverpassQueryBuilder.build_area_query(area, ["biking"])
+            query = OverpassQueryBuilder.build_area_query(area, BIKING_ONLY)
             assert area.replace('"', '\\"') in query, f"Area name {area} should be in query"
             print(f"PASS: Query for {area} built successfully")
         except Exception as e:
@@ -213,9 +319,7 @@ async def test_area_query_biking_trails():
     # Test 3: Test actual Overpass API query (if network available)
     try:
         print("\nTesting actual Overpass API query for biking trails in Central Park...")
-        query = OverpassQueryBuilder.build_area_query("Central Park", ["biking"])
-        print(f"query: {query}")
-        data = await query_overpass(query)
+        _, data = await asyncio.shield(get_network_results())
 
         print(f"data: {data}")
         
@@ -224,15 +328,7 @@ async def test_area_query_biking_trails():
             print(f"PASS: Found {len(elements)} elements in Central Park biking query")
             
             # Validate that we have some biking-related elements
-            biking_elements = 0
-            for element in elements:
-                if element.get("type") in ["way", "relation"]:
-                    tags = element.get("tags", {})
-                    # Check for biking indicators
-                    if (tags.get("route") in ["bicycle", "mtb"] or 
-                        tags.get("highway") == "cycleway" or
-                        tags.get("bicycle") == "yes"):
-                        biking_elements += 1
+            biking_elements = sum(map(is_biking, elements))
             
             print(f"PASS: Found {biking_elements} biking-related elements")
             
@@ -261,22 +357,54 @@ async def main():
     print("Trail Explorer MCP Server - Test Suite")
     print("=" * 50)
     
+    # (name, test, uses the Overpass API), in the order results are reported
     tests = [
-        ("Query Builder", test_query_builder()),
-        ("Trail Type Identification", test_trail_type_identification()),
-        ("Trail Type Validation", test_trail_type_validation()),
-        ("Configuration", test_configuration()),
-        ("Overpass API Query", test_overpass_query()),
-        ("Area Query Biking Trails", test_area_query_biking_trails()),
+        ("Query Builder", test_query_builder, False),
+        ("Trail Type Identification", test_trail_type_identification, False),
+        ("Trail Type Validation", test_trail_type_validation, False),
+        ("Configuration", test_configuration, False),
+        ("Overpass API Query", test_overpass_query, True),
+        ("Area Query Biking Trails", test_area_query_biking_trails, True),
     ]
+    async_tests = [test for test in tests if asyncio.iscoroutinefunction(test[1])]
+    sync_tests = [test for test in tests if not asyncio.iscoroutinefunction(test[1])]
     
-    results = []
-    for test_name, test_coro in tests:
-        if asyncio.iscoroutine(test_coro):
-            result = await test_coro
-        else:
-            result = test_coro
-        results.append((test_name, result))
+    # Overpass allows about two concurrent queries per IP
+    network_slots = asyncio.Semaphore(2)
+    
+    async def run_with_timeout(test_name, test_fn):
+        try:
+            return await asyncio.wait_for(test_fn(), ASYNC_TEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"WARNING: {test_name} timed out after {ASYNC_TEST_TIMEOUT:g}s (this is normal on a slow network)")
+            return True  # Don't fail the test for network issues
+    
+    async def run_async_test(test_name, test_fn, uses_network):
+        if not uses_network:
+            return await run_with_timeout(test_name, test_fn)
+        async with network_slots:
+            return await run_with_timeout(test_name, test_fn)
+    
+    # The sync tests are pure CPU, so run them first on this thread; their output can't
+    # interleave with the async tests'. Then run the async tests concurrently so the
+    # network tests overlap their waits. They share the server's pooled Overpass client,
+    # which is closed afterwards.
+    sync_results = [test_fn() for _, test_fn, _ in sync_tests]
+    try:
+        async_results = await asyncio.gather(
+            *(run_async_test(*test) for test in async_tests),
+            return_exceptions=True
+        )
+    finally:
+        await close_client()
+    
+    results_by_name = {test_name: result for (test_name, _, _), result in zip(sync_tests, sync_results)}
+    for (test_name, _, _), result in zip(async_tests, async_results):
+        if isinstance(result, BaseException):
+            print(f"FAIL: {test_name} raised {result!r}")
+            result = False
+        results_by_name[test_name] = result
+    results = [(test_name, results_by_name[test_name]) for test_name, _, _ in tests]
     
     print("\n" + "=" * 50)
     print("Test Results:")
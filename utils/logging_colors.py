@@ -1,5 +1,11 @@
 from colorama import Fore, Style, init as colorama_init
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+from functools import lru_cache
+from typing import Dict, Optional
 
 colorama_init(autoreset=True)
 
@@ -12,26 +18,76 @@ class ColorFormatter(logging.Formatter):
     def __init__(self, color, fmt=None, datefmt=None):
         super().__init__(fmt=fmt, datefmt=datefmt)
         self.color = color
+        # The escape sequences never change, so build them once
+        self._prefix = Style.BRIGHT + color
+        self._suffix = RESET
 
     def format(self, record):
-        message = super().format(record)
-        return f"{Style.BRIGHT}{self.color}{message}{RESET}"
+        return self._prefix + super().format(record) + self._suffix
 
-def setup_logger(name: str, color, fmt: str = "%(levelname)s: %(message)s") -> logging.Logger:
+class LoggerDispatchHandler(logging.Handler):
+    """Route queued records to the stream handler of the logger that emitted them."""
+
+    def __init__(self):
+        super().__init__()
+        self.handlers: Dict[str, logging.Handler] = {}
+
+    def emit(self, record):
+        handler = self.handlers.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+
+# Queued records are formatted and written by a single background thread
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_dispatch_handler = LoggerDispatchHandler()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _start_listener():
+    """Start the background log listener once; it is flushed and stopped at exit."""
+    global _listener
+    if _listener is None:
+        _listener = logging.handlers.QueueListener(_log_queue, _dispatch_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+def use_color(stream) -> bool:
+    """Color only terminals, honoring the NO_COLOR and FORCE_COLOR conventions."""
+    if os.environ.get("NO_COLOR"):
+        return False
+    if os.environ.get("FORCE_COLOR"):
+        return True
+    isatty = getattr(stream, "isatty", None)
+    return bool(isatty and isatty())
+
+# Colors are colorama escape strings, so every argument is hashable
+@lru_cache(maxsize=None)
+def setup_logger(name: str, color, fmt: str = "%(levelname)s: %(message)s", queued: bool = True) -> logging.Logger:
     """Set up a logger with colored output and proper configuration.
-    
+
     Args:
         name: Logger name
-        color: Color from colorama (e.g., SERVER_COLOR, CLIENT_COLOR)
+        color: Color from colorama (e.g., SERVER_COLOR, CLIENT_COLOR); only applied when
+            writing to a terminal, or when FORCE_COLOR is set (NO_COLOR always disables it)
         fmt: Log format string (default includes level and message)
-    
+        queued: Hand records to a background thread for formatting and writing.
+            Pass False for interactive output that must stay in order with print()/input().
+
     Returns:
         Configured logger instance
     """
     logger = logging.getLogger(name)
+    if logger.handlers:
+        # Already configured (e.g. with other arguments); installing another handler would emit every record twice
+        return logger
     handler = logging.StreamHandler()
-    handler.setFormatter(ColorFormatter(color, fmt=fmt))
-    logger.handlers = [handler]
+    # Plain output for redirected streams skips the escape codes on every record
+    handler.setFormatter(ColorFormatter(color, fmt=fmt) if use_color(handler.stream) else logging.Formatter(fmt))
+    if queued:
+        _dispatch_handler.handlers[name] = handler
+        _start_listener()
+        logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+    else:
+        logger.handlers = [handler]
     logger.setLevel(logging.INFO)
     logger.propagate = False
-    return logger 
\ No newline at end of file
+    return logger